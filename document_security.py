@@ -18,6 +18,8 @@ import os
 import time
 import secrets
 import uuid
+import re
+from functools import lru_cache
 from typing import Dict, Optional, Tuple, Union, Any
 from pathlib import Path
 import logging
@@ -437,8 +439,16 @@ class BindingStorage:
         """Save a binding record using UUID as primary key"""
         try:
             record_file = self.storage_dir / f"{document_id}.json"
-            with open(record_file, 'w') as f:
-                json.dump(record, f, indent=2)
+            # Write a new file and rename it over the record, so an existing record file is
+            # replaced rather than rewritten in place (hard-linked backups stay unchanged)
+            temp_file = record_file.with_name(f"{record_file.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                with open(temp_file, 'w') as f:
+                    json.dump(record, f, indent=2)
+                os.replace(temp_file, record_file)
+            finally:
+                if temp_file.exists():
+                    temp_file.unlink()
             logger.info(f"Saved binding record: {document_id}")
             return True
         except Exception as e:
@@ -559,8 +569,26 @@ def quick_binding_verification(qr_data: str, document_path: str) -> Dict[str, An
         } 
 
 
+# Canonical 8-4-4-4-12 form; other spellings uuid.UUID accepts are checked by parsing
+_CANONICAL_UUID_RE = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_uuid_string(uuid_string: str) -> bool:
+    """Cached UUID check for strings (record file names are checked repeatedly)"""
+    if _CANONICAL_UUID_RE.fullmatch(uuid_string):
+        return True
+    try:
+        uuid.UUID(uuid_string)
+        return True
+    except ValueError:
+        return False
+
+
 def is_valid_uuid(uuid_string: str) -> bool:
     """Check if a string is a valid UUID format"""
+    if isinstance(uuid_string, str):
+        return _is_valid_uuid_string(uuid_string)
     try:
         uuid.UUID(uuid_string)
         return True
@@ -1,23 +1,38 @@
 # File: lsb_steganography.py
 # Deskripsi: Fungsi inti untuk menyisipkan dan mengekstrak QR Code menggunakan LSB.
 
-from PIL import Image
+from PIL import Image, ImageStat
 from PIL.Image import Resampling
-import itertools
 import os
 import math
+import copy
 import logging
 import numpy as np
-from typing import Dict, Tuple, Union, Optional
+from typing import BinaryIO, Dict, List, Tuple, Union, Optional
 import time
+import queue
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-# Setup logging for enhanced functionality
-logging.basicConfig(level=logging.INFO)
+# Konfigurasi logging diserahkan ke aplikasi pemanggil (app.py / CLI)
 logger = logging.getLogger(__name__)
 
 HEADER_TERMINATOR_BIN = '00000000'
 HEADER_TERMINATOR_LEN = len(HEADER_TERMINATOR_BIN)
 
+# Jumlah baris cover yang diproses sekaligus saat penyisipan (membatasi memori kerja)
+EMBED_BAND_ROWS = 256
+
+# Langkah subsampling piksel untuk statistik kompleksitas/kecerahan pada analisis kapasitas
+ANALYSIS_SAMPLE_STRIDE = 8
+
+# Perkiraan kapasitas QR versi 1-20 (mode alfanumerik, koreksi error L), indeks 0 = versi 1
+_QR_CAPACITIES = np.array([
+    25, 47, 77, 114, 154, 195, 224, 279, 335, 395,
+    468, 535, 619, 667, 758, 854, 938, 1046, 1153, 1249
+], dtype=np.int32)
+
 
 def _int_to_binary(integer: int, bits: int) -> str:
     """
@@ -54,13 +69,39 @@ def _extract_lsb(pixel_value: int) -> str:
     return '1' if pixel_value % 2 == 1 else '0'
 
 
-def _resize_qr_for_capacity(qr_img, max_capacity: int):
+def _detect_qr_module_count(qr_img) -> Optional[int]:
+    """
+    Mendeteksi jumlah modul (termasuk border) per sisi dari citra QR code.
+    Lebar modul diukur dari baris pertama finder pattern kiri atas (7 modul hitam).
+    Mengembalikan None jika grid modul tidak dapat dipastikan.
+    """
+    dark = np.asarray(qr_img.convert('L')) < 128
+    dark_rows = np.flatnonzero(dark.any(axis=1))
+    if dark_rows.size == 0:
+        return None
+
+    row = dark[dark_rows[0]]
+    start = int(np.argmax(row))
+    light_after = np.flatnonzero(~row[start:])
+    run_length = int(light_after[0]) if light_after.size else row.size - start
+
+    # Finder pattern selalu 7 modul, sehingga run harus habis dibagi 7
+    if run_length % 7 != 0:
+        return None
+    module_px = run_length // 7
+    if qr_img.width % module_px != 0:
+        return None
+    return qr_img.width // module_px
+
+
+def _resize_qr_for_capacity(qr_img, max_capacity: int, module_count: Optional[int] = None):
     """
     Menyesuaikan ukuran QR code agar muat dalam kapasitas citra penampung.
 
     Args:
         qr_img: Objek Image dari QR code yang perlu disesuaikan.
         max_capacity: Kapasitas maksimum yang tersedia dalam bit.
+        module_count: Jumlah modul per sisi QR (termasuk border). Jika None, dideteksi dari citra.
 
     Returns:
         Objek Image dari QR code yang telah diresize.
@@ -73,21 +114,123 @@ def _resize_qr_for_capacity(qr_img, max_capacity: int):
 
     # Hitung dimensi maksimum berdasarkan akar kuadrat dari kapasitas
     # Kita perlu bilangan bulat yang ketika dikuadratkan <= available_bits_for_qr
-    new_dimension = int(math.sqrt(available_bits_for_qr))
+    new_dimension = math.isqrt(available_bits_for_qr)
 
     # Jika QR lebih kecil dari dimensi maksimal, tidak perlu diresize
     if qr_img.width <= new_dimension and qr_img.height <= new_dimension:
         return qr_img
 
-    # Resize QR secara proporsional tapi tidak lebih besar dari dimensi maksimum
-    new_size = min(new_dimension, new_dimension)
+    # Resize QR menjadi persegi seukuran dimensi maksimum
+    new_size = new_dimension
+    # Bulatkan ke kelipatan jumlah modul agar NEAREST tidak merusak batas antar modul
+    if module_count is None:
+        module_count = _detect_qr_module_count(qr_img)
+    if module_count and new_dimension >= module_count:
+        new_size = (new_dimension // module_count) * module_count
+    # QR terkecil (versi 1) memiliki 21x21 modul, di bawah itu QR tidak dapat dibaca
+    if new_size < 21:
+        raise ValueError("Kapasitas cover image terlalu kecil untuk QR code apa pun (minimal 21x21).")
     # Resize QR code dengan tetap mempertahankan mode
     resized_qr = qr_img.resize((new_size, new_size), Resampling.NEAREST)
-    print(f"[*] QR code diresize dari {qr_img.width}x{qr_img.height} ke {new_size}x{new_size} agar muat dalam kapasitas.")
+    logger.debug(f"QR code diresize dari {qr_img.width}x{qr_img.height} ke {new_size}x{new_size} agar muat dalam kapasitas.")
     return resized_qr
 
 
-def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_path: str, resize_qr_if_needed: bool = True):
+def build_qr_bitstream(qr_image_path: str) -> np.ndarray:
+    """
+    Membangun aliran bit QR Code satu kali agar dapat dipakai ulang untuk banyak citra penampung.
+
+    Args:
+        qr_image_path (str): Path ke citra QR Code (hitam putih).
+
+    Returns:
+        np.ndarray: Array bool datar (urutan baris), True untuk piksel hitam.
+    """
+    qr_img = Image.open(qr_image_path).convert('1')
+    return _qr_image_to_bits(qr_img)
+
+
+def _qr_image_to_bits(qr_img) -> np.ndarray:
+    """Konversi citra QR mode '1' menjadi array bit datar, True (bit '1') untuk piksel hitam."""
+    # Pada mode '1' numpy memberi True untuk putih, sehingga dibalik untuk mendapatkan hitam
+    return ~np.asarray(qr_img.convert('1'), dtype=bool).ravel()
+
+
+def _header_bits_array(qr_width: int, qr_height: int) -> np.ndarray:
+    """Header (lebar 16 bit + tinggi 16 bit + terminator) sebagai array uint8 berisi 0/1."""
+    header_bits = _int_to_binary(qr_width, 16) + _int_to_binary(qr_height, 16) + HEADER_TERMINATOR_BIN
+    return np.frombuffer(header_bits.encode('ascii'), dtype=np.uint8) - ord('0')
+
+
+def _payload_bits(qr_bits: np.ndarray, qr_shape: Tuple[int, int]) -> np.ndarray:
+    """Aliran bit lengkap yang disisipkan: header (dimensi QR) diikuti bit QR, uint8 berisi 0/1."""
+    qr_width, qr_height = qr_shape
+    return np.concatenate((_header_bits_array(qr_width, qr_height), qr_bits.astype(np.uint8)))
+
+
+def _embed_bits_into_cover(cover_img, data_bits: np.ndarray, output_stego_path: str, compress_level: int = 6):
+    """
+    Menyisipkan aliran bit header + QR (lihat _payload_bits) ke LSB channel Biru dari citra
+    penampung yang sudah dibuka. Penyisipan dilakukan dengan operasi bitwise numpy;
+    cover_img dimodifikasi langsung, data_bits hanya dibaca (boleh dipakai ulang).
+    """
+    max_capacity = cover_img.width * cover_img.height
+
+    total_bits_to_embed = data_bits.size
+    if total_bits_to_embed > max_capacity:
+        raise ValueError(f"Kapasitas citra tidak cukup bahkan setelah resize. Dibutuhkan: {total_bits_to_embed} bits, Tersedia: {max_capacity} bits.")
+
+    logger.debug(f"Total bit untuk disisipkan: {total_bits_to_embed}")
+    logger.debug(f"Kapasitas citra penampung (Blue channel LSB): {max_capacity} bits")
+
+    # Piksel diproses berurutan baris demi baris (y lalu x), sama dengan urutan ekstraksi.
+    # Hanya baris yang memuat bit yang disalin ke numpy, per pita EMBED_BAND_ROWS baris,
+    # sehingga memori kerja tetap kecil untuk cover beresolusi besar.
+    width = cover_img.width
+    rows_needed = -(-total_bits_to_embed // width)
+    bit_offset = 0
+    for band_top in range(0, rows_needed, EMBED_BAND_ROWS):
+        band_bottom = min(band_top + EMBED_BAND_ROWS, rows_needed)
+        band_array = np.array(cover_img.crop((0, band_top, width, band_bottom)), dtype=np.uint8)
+        # View (bukan salinan) piksel berurutan; kolom 2 = channel biru, diubah di tempat
+        pixels = band_array.reshape(-1, 3)
+        n = min(pixels.shape[0], total_bits_to_embed - bit_offset)
+        pixels[:n, 2] = (pixels[:n, 2] & 0xFE) | data_bits[bit_offset:bit_offset + n]
+        cover_img.paste(Image.fromarray(band_array, 'RGB'), (0, band_top))
+        bit_offset += n
+
+    logger.debug(f"Penyisipan selesai. {total_bits_to_embed} piksel dimodifikasi.")
+    cover_img.save(output_stego_path, "PNG", compress_level=compress_level)
+    logger.debug(f"Stego image disimpan di: {output_stego_path}")
+
+
+def embed_bits_to_image(cover_image_path: str, qr_bits: np.ndarray, qr_shape: Tuple[int, int], output_stego_path: str):
+    """
+    Menyisipkan aliran bit QR yang sudah dibangun (lihat build_qr_bitstream) ke citra penampung.
+
+    Args:
+        cover_image_path (str): Path ke citra penampung.
+        qr_bits (np.ndarray): Array bit QR datar, True/1 untuk piksel hitam.
+        qr_shape (Tuple[int, int]): Dimensi QR (width, height) yang ditulis ke header.
+        output_stego_path (str): Path untuk menyimpan citra hasil (harus PNG).
+
+    Raises:
+        FileNotFoundError: Jika file cover tidak ditemukan.
+        ValueError: Jika kapasitas tidak cukup atau format output salah.
+    """
+    if not os.path.exists(cover_image_path):
+        raise FileNotFoundError(f"File cover tidak ditemukan: {cover_image_path}")
+    if not output_stego_path.lower().endswith('.png'):
+        raise ValueError("Output file harus berformat PNG untuk menjaga LSB.")
+    if qr_bits.size != qr_shape[0] * qr_shape[1]:
+        raise ValueError(f"Jumlah bit QR ({qr_bits.size}) tidak sesuai dengan dimensi {qr_shape[0]}x{qr_shape[1]}.")
+
+    cover_img = Image.open(cover_image_path).convert('RGB')
+    _embed_bits_into_cover(cover_img, _payload_bits(qr_bits, qr_shape), output_stego_path)
+
+
+def embed_qr_to_image(cover_image_path: str, qr_image_path: Optional[str], output_stego_path: str,
+                      resize_qr_if_needed: bool = True, qr_array: Optional[np.ndarray] = None):
     """
     Menyisipkan citra QR Code ke dalam LSB channel Biru dari citra penampung.
 
@@ -96,6 +239,8 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         qr_image_path (str): Path ke citra QR Code yang akan disembunyikan (harus hitam putih).
         output_stego_path (str): Path untuk menyimpan citra hasil (harus PNG).
         resize_qr_if_needed (bool): Jika True, QR code akan diresize otomatis agar muat dalam kapasitas.
+        qr_array (Optional[np.ndarray]): QR yang sudah dimuat (2D, 1/True = modul hitam).
+            Jika diberikan, dipakai sebagai ganti qr_image_path sehingga QR tidak didekode ulang.
 
     Raises:
         FileNotFoundError: Jika file input tidak ditemukan.
@@ -103,12 +248,12 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         Exception: Jika terjadi error lain selama proses.
     """
 
-    print("[*] Memulai proses embed_qr_to_image")  # Log awal fungsi
+    logger.debug("Memulai proses embed_qr_to_image")  # Log awal fungsi
 
     # Validasi keberadaan file input
     if not os.path.exists(cover_image_path):
         raise FileNotFoundError(f"File cover tidak ditemukan: {cover_image_path}")
-    if not os.path.exists(qr_image_path):
+    if qr_array is None and not os.path.exists(qr_image_path):
         raise FileNotFoundError(f"File QR Code tidak ditemukan: {qr_image_path}")
     # Memastikan output adalah PNG untuk menjaga integritas LSB
     if not output_stego_path.lower().endswith('.png'):
@@ -117,249 +262,266 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
     try:
         # 1. Buka kedua citra
         cover_img = Image.open(cover_image_path).convert('RGB')  # Pastikan format RGB
-        qr_img = Image.open(qr_image_path).convert('1')  # Konversi QR ke mode 1-bit (hitam/putih)
+        qr_img = _load_qr_image(qr_image_path, qr_array)  # QR dalam mode 1-bit (hitam/putih)
 
         # Cek apakah file cover dan QR sama
-        if os.path.abspath(cover_image_path) == os.path.abspath(qr_image_path):
-            print("[!] Warning: File cover dan QR sama. Ini dapat menyebabkan masalah kapasitas.")
-
-        cover_width, cover_height = cover_img.size
-        qr_width, qr_height = qr_img.size
-
-        # Hitung kapasitas citra penampung
-        max_capacity = cover_width * cover_height
-
-        # 2. Buat aliran bit dari QR Code
-        # Cek dulu jika perlu resize QR
-        original_qr_size = (qr_width, qr_height)
-
-        # Perkiraan kebutuhan bit untuk header dan data QR
-        header_bits_len = 16 + 16 + HEADER_TERMINATOR_LEN
-        qr_bits_len = qr_width * qr_height
-        total_bits_needed = header_bits_len + qr_bits_len
-
-        # Jika kapasitas tidak cukup, resize QR jika opsi diaktifkan
-        if total_bits_needed > max_capacity:
-            if resize_qr_if_needed:
-                qr_img = _resize_qr_for_capacity(qr_img, max_capacity)
-                qr_width, qr_height = qr_img.size
-                print("[*] QR code diresize untuk menyesuaikan dengan kapasitas.")
-            else:
-                raise ValueError(f"Kapasitas citra tidak cukup. Dibutuhkan: {total_bits_needed} bits, Tersedia: {max_capacity} bits.")
-
-        # Iterasi piksel QR, '1' untuk hitam (nilai 0 di mode '1'), '0' untuk putih (nilai 255)
-        qr_bits = "".join(['1' if qr_img.getpixel((x, y)) == 0 else '0'
-                          for y in range(qr_height) for x in range(qr_width)])
-        num_qr_bits = len(qr_bits)
-
-        # 3. Buat header: 16 bit untuk lebar QR, 16 bit untuk tinggi QR, + terminator
-        header_bits = _int_to_binary(qr_width, 16) + _int_to_binary(qr_height, 16) + HEADER_TERMINATOR_BIN
-        num_header_bits = len(header_bits)
-
-        # Total bit yang perlu disisipkan
-        total_bits_to_embed = num_header_bits + num_qr_bits
-
-        # 4. Cek kapasitas final citra penampung setelah resize (jika ada)
-        if total_bits_to_embed > max_capacity:
-            raise ValueError(f"Kapasitas citra tidak cukup bahkan setelah resize. Dibutuhkan: {total_bits_to_embed} bits, Tersedia: {max_capacity} bits.")
-
-        # Informasi proses
-        print(f"[*] Ukuran QR Code: {qr_width}x{qr_height}")
-        if original_qr_size != (qr_width, qr_height):
-            print(f"[*] QR Code diresize dari {original_qr_size[0]}x{original_qr_size[1]} ke {qr_width}x{qr_height}")
-        print(f"[*] Jumlah bit QR Code: {num_qr_bits}")
-        print(f"[*] Jumlah bit Header: {num_header_bits}")
-        print(f"[*] Total bit untuk disisipkan: {total_bits_to_embed}")
-        print(f"[*] Kapasitas citra penampung (Blue channel LSB): {max_capacity} bits")
-
-        # 5. Siapkan data untuk disisipkan dan citra output
-        data_bits_iterator = iter(header_bits + qr_bits)  # Iterator untuk bit header + QR
-        stego_img = cover_img.copy()  # Salin citra asli untuk dimodifikasi
-        pixels_processed = 0
-
-        # 6. Proses penyisipan bit ke LSB channel Biru
-        for y in range(cover_height):
-            for x in range(cover_width):
-                try:
-                    # Ambil bit berikutnya dari iterator
-                    bit_to_embed = next(data_bits_iterator)
-                    # Dapatkan nilai RGB piksel saat ini
-                    r, g, b = stego_img.getpixel((x, y))
-                    # Modifikasi hanya channel Biru (b) dengan bit yang akan disisipkan
-                    new_b = _embed_bit(b, bit_to_embed)
-                    # Update piksel di citra stego
-                    stego_img.putpixel((x, y), (r, g, new_b))
-                    pixels_processed += 1
-                except StopIteration:
-                    # Jika iterator habis (semua bit sudah disisipkan)
-                    print(f"[*] Penyisipan selesai. {pixels_processed} piksel dimodifikasi.")
-                    # Simpan stego image dalam format PNG
-                    stego_img.save(output_stego_path, "PNG")
-                    print(f"[*] Stego image disimpan di: {output_stego_path}")
-                    return  # Keluar dari fungsi setelah penyimpanan berhasil
-
-        # Baris ini seharusnya tidak tercapai jika kapasitas cukup
-        print("[!] Warning: Loop selesai tapi tidak semua bit tersisip? Cek logika kapasitas.")
+        if qr_array is None and os.path.abspath(cover_image_path) == os.path.abspath(qr_image_path):
+            logger.warning("File cover dan QR sama. Ini dapat menyebabkan masalah kapasitas.")
+
+        qr_img = _fit_qr_to_cover(qr_img, cover_img.size, resize_qr_if_needed)
+
+        # 2. Buat aliran bit dari QR Code, '1' untuk hitam (nilai 0 di mode '1'), '0' untuk putih
+        qr_bits = _qr_image_to_bits(qr_img)
+        logger.debug(f"Ukuran QR Code: {qr_img.width}x{qr_img.height}")
+        logger.debug(f"Jumlah bit QR Code: {qr_bits.size}")
+
+        # 3. Sisipkan header + bit QR ke LSB channel Biru dan simpan
+        _embed_bits_into_cover(cover_img, _payload_bits(qr_bits, qr_img.size), output_stego_path)
 
     # Menangani error spesifik dan umum
     except FileNotFoundError as e:
-        print(f"[!] Error: {e}")
+        logger.error(f"Error: {e}")
         raise
     except ValueError as e:
-        print(f"[!] Error: {e}")
+        logger.error(f"Error: {e}")
         raise
     except Exception as e:
-        print(f"[!] Error saat proses embedding: {e}")
+        logger.error(f"Error saat proses embedding: {e}")
         raise
 
 
-def extract_qr_from_image(stego_image_path: str, output_qr_path: str):
+def _load_qr_image(qr_image_path: Optional[str], qr_array: Optional[np.ndarray] = None):
+    """
+    Memuat QR sebagai citra mode '1', dari array yang sudah dimuat (1/True = hitam) bila ada,
+    jika tidak dari file.
+    """
+    if qr_array is not None:
+        return Image.fromarray(np.where(qr_array, 0, 255).astype(np.uint8), 'L').convert('1')
+    return Image.open(qr_image_path).convert('1')
+
+
+def _fit_qr_to_cover(qr_img, cover_size: Tuple[int, int], resize_qr_if_needed: bool):
+    """
+    Memastikan QR (beserta header) muat di citra penampung, meresize QR bila diizinkan.
+
+    Returns:
+        Objek Image QR yang siap disisipkan.
+    """
+    max_capacity = cover_size[0] * cover_size[1]
+    header_bits_len = 16 + 16 + HEADER_TERMINATOR_LEN
+    total_bits_needed = header_bits_len + qr_img.width * qr_img.height
+
+    if total_bits_needed <= max_capacity:
+        return qr_img
+    if not resize_qr_if_needed:
+        raise ValueError(f"Kapasitas citra tidak cukup. Dibutuhkan: {total_bits_needed} bits, Tersedia: {max_capacity} bits.")
+
+    original_qr_size = qr_img.size
+    qr_img = _resize_qr_for_capacity(qr_img, max_capacity)
+    logger.debug(f"QR Code diresize dari {original_qr_size[0]}x{original_qr_size[1]} ke {qr_img.width}x{qr_img.height}")
+    return qr_img
+
+
+def embed_qr_to_images_batch(cover_image_paths: List[str], qr_image_path: Optional[str],
+                             output_stego_paths: List[str], resize_qr_if_needed: bool = True,
+                             qr_array: Optional[np.ndarray] = None,
+                             compress_level: int = 6,
+                             output_blobs: Optional[List[Optional[bytes]]] = None) -> List[Optional[str]]:
+    """
+    Menyisipkan QR Code yang sama ke banyak citra penampung.
+    Citra QR hanya didekode dan dikonversi menjadi aliran bit satu kali; versi hasil resize
+    di-cache per ukuran sehingga cover dengan kapasitas serupa berbagi aliran bit yang sama.
+
+    Args:
+        cover_image_paths (List[str]): Daftar path citra penampung.
+        qr_image_path (str): Path ke citra QR Code.
+        output_stego_paths (List[str]): Daftar path output (PNG), sejajar dengan cover_image_paths.
+        resize_qr_if_needed (bool): Jika True, QR diresize otomatis untuk cover yang terlalu kecil.
+        qr_array (Optional[np.ndarray]): QR yang sudah dimuat (lihat embed_qr_to_image),
+            dipakai sebagai ganti qr_image_path.
+        compress_level (int): Level zlib PNG output (0-9). Gunakan 1 untuk file sementara
+            yang akan di-encode ulang oleh pemanggil (mis. disisipkan ke PDF).
+        output_blobs (Optional[List[Optional[bytes]]]): Jika diberikan, byte PNG setiap stego
+            image (None jika gagal) ditambahkan ke list ini, sehingga pemanggil tidak perlu
+            membaca ulang file output.
+
+    Returns:
+        List[Optional[str]]: Pesan error per cover, None jika berhasil.
+    """
+    if len(cover_image_paths) != len(output_stego_paths):
+        raise ValueError("Jumlah cover dan output harus sama.")
+    if qr_array is None and not os.path.exists(qr_image_path):
+        raise FileNotFoundError(f"File QR Code tidak ditemukan: {qr_image_path}")
+
+    qr_img = _load_qr_image(qr_image_path, qr_array)
+    # Aliran bit header + QR per ukuran QR; dipakai ulang (hanya dibaca) oleh setiap cover
+    payload_by_size = {qr_img.size: _payload_bits(_qr_image_to_bits(qr_img), qr_img.size)}
+    # Satu buffer PNG untuk seluruh batch, dikosongkan sebelum setiap cover
+    buffer = BytesIO() if output_blobs is not None else None
+
+    errors = []
+    for cover_path, output_path in zip(cover_image_paths, output_stego_paths):
+        try:
+            if not os.path.exists(cover_path):
+                raise FileNotFoundError(f"File cover tidak ditemukan: {cover_path}")
+            if not output_path.lower().endswith('.png'):
+                raise ValueError("Output file harus berformat PNG untuk menjaga LSB.")
+
+            cover_img = Image.open(cover_path).convert('RGB')
+            fitted_qr = _fit_qr_to_cover(qr_img, cover_img.size, resize_qr_if_needed)
+            data_bits = payload_by_size.get(fitted_qr.size)
+            if data_bits is None:
+                data_bits = payload_by_size[fitted_qr.size] = _payload_bits(_qr_image_to_bits(fitted_qr),
+                                                                           fitted_qr.size)
+
+            if output_blobs is None:
+                _embed_bits_into_cover(cover_img, data_bits, output_path, compress_level)
+            else:
+                # Encode sekali ke memori, lalu tulis byte yang sama ke file output
+                buffer.seek(0)
+                buffer.truncate()
+                _embed_bits_into_cover(cover_img, data_bits, buffer, compress_level)
+                png_bytes = buffer.getvalue()
+                with open(output_path, "wb") as f:
+                    f.write(png_bytes)
+                output_blobs.append(png_bytes)
+            errors.append(None)
+        except Exception as e:
+            logger.error(f"Error saat proses embedding {cover_path}: {e}")
+            errors.append(str(e))
+            if output_blobs is not None:
+                output_blobs.append(None)
+
+    return errors
+
+
+def _read_blue_lsbs(img, start: int, count: int) -> np.ndarray:
+    """
+    Membaca LSB channel Biru untuk piksel ke-start hingga start+count (urutan baris).
+    Hanya baris yang dibutuhkan yang disalin ke numpy; hasil bisa lebih pendek jika citra habis.
+    """
+    width, height = img.size
+    end = min(start + count, width * height)
+    if end <= start:
+        return np.zeros(0, dtype=np.uint8)
+
+    top, bottom = start // width, -(-end // width)
+    band = np.asarray(img.crop((0, top, width, bottom)), dtype=np.uint8)
+    offset = start - top * width
+    return band[:, :, 2].reshape(-1)[offset:offset + end - start] & 1
+
+
+def extract_qr_from_image(stego_image_path: Union[str, BinaryIO], output_qr_path: str):
     """
     Mengekstrak citra QR Code yang tersembunyi dari LSB channel Biru stego image.
 
     Args:
-        stego_image_path (str): Path ke stego image (harus PNG).
+        stego_image_path (str | file-like): Path ke stego image (harus PNG), atau isi file
+            yang sudah ada di memori (mis. BytesIO) agar tidak perlu ditulis ke disk dulu.
         output_qr_path (str): Path untuk menyimpan citra QR hasil ekstraksi (akan dibuat PNG).
 
+    Returns:
+        numpy.ndarray: Piksel QR hasil rekonstruksi (uint8, 0 = hitam, 255 = putih).
+
     Raises:
         FileNotFoundError: Jika file stego tidak ditemukan.
         ValueError: Jika header tidak valid, terminator tidak ditemukan, atau data tidak cukup.
         Exception: Jika terjadi error lain selama proses.
     """
 
-    print("[*] Memulai proses extract_qr_from_image")  # Log awal fungsi
+    logger.debug("Memulai proses extract_qr_from_image")  # Log awal fungsi
 
     # Validasi file input
-    if not os.path.exists(stego_image_path):
+    if isinstance(stego_image_path, str) and not os.path.exists(stego_image_path):
         raise FileNotFoundError(f"File stego tidak ditemukan: {stego_image_path}")
     # Menyesuaikan output path jika tidak diakhiri .png
     if not output_qr_path.lower().endswith('.png'):
-        print("[!] Warning: Output path disarankan .png, akan disimpan sebagai PNG.")
+        logger.warning("Output path disarankan .png, akan disimpan sebagai PNG.")
         output_qr_path = os.path.splitext(output_qr_path)[0] + ".png"
 
     try:
-        # Buka stego image dalam mode RGB
-        stego_img = Image.open(stego_image_path).convert('RGB')
+        # Buka stego image dalam mode RGB (RGBA sudah punya channel Biru di indeks 2, tanpa salinan)
+        stego_img = Image.open(stego_image_path)
+        if stego_img.mode not in ('RGB', 'RGBA'):
+            stego_img = stego_img.convert('RGB')
         width, height = stego_img.size
 
-        extracted_bits = ""  # String untuk menampung bit yang diekstrak
-        pixels_processed = 0  # Counter piksel yang diproses
-        header_found = False  # Flag penanda header sudah ditemukan
-        qr_width = 0
-        qr_height = 0
         # Total panjang header = 16 (lebar) + 16 (tinggi) + panjang terminator
         num_header_bits = 16 + 16 + HEADER_TERMINATOR_LEN
+        # Toleransi batas pencarian terminator
+        header_search_bits = num_header_bits + 501
 
         # 1. Ekstrak Header (Dimensi QR)
-        print("[*] Mengekstrak header...")
-        # Iterasi piksel stego image
-        for y in range(height):
-            for x in range(width):
-                # Dapatkan nilai RGB
-                r, g, b = stego_img.getpixel((x, y))
-                # Ekstrak LSB dari channel Biru
-                extracted_bits += _extract_lsb(b)
-                pixels_processed += 1
-
-                # Cek apakah sudah cukup bit untuk header + terminator
-                if len(extracted_bits) >= num_header_bits:
-                    # Cek apakah bagian akhir bit cocok dengan terminator
-                    if extracted_bits.endswith(HEADER_TERMINATOR_BIN):
-                        # Ambil bagian header (sebelum terminator)
-                        header_data = extracted_bits[:-HEADER_TERMINATOR_LEN]
-                        # Pastikan panjangnya 32 bit (16+16)
-                        if len(header_data) == 32:
-                            # Konversi bit header ke integer untuk lebar dan tinggi
-                            qr_width = _binary_to_int(header_data[:16])
-                            qr_height = _binary_to_int(header_data[16:])
-                            header_found = True
-                            print(f"[*] Header ditemukan! Dimensi QR: {qr_width}x{qr_height}")
-                            break  # Keluar dari loop x karena header sudah ketemu
-                        else:
-                            # Error jika panjang header tidak sesuai
-                            raise ValueError("Panjang header tidak sesuai setelah terminator ditemukan.")
-                    # Jika bit sudah banyak tapi terminator belum ketemu, mungkin error
-                    elif len(extracted_bits) > num_header_bits + 500:  # Toleransi batas pencarian
-                        raise ValueError("Terminator header tidak ditemukan dalam batas wajar piksel.")
-
-            if header_found:
-                break  # Keluar dari loop y jika header sudah ketemu
-
-        # Jika setelah iterasi seluruh piksel header tidak ditemukan
-        if not header_found:
+        logger.debug("Mengekstrak header...")
+        header_bits = _read_blue_lsbs(stego_img, 0, header_search_bits)
+        if header_bits.size < num_header_bits:
+            raise ValueError("Gagal menemukan header QR Code dalam citra.")
+
+        if not header_bits[32:num_header_bits].any():
+            # Konversi bit header ke integer untuk lebar dan tinggi
+            header_data = "".join(map(str, header_bits[:32].tolist()))
+            qr_width = _binary_to_int(header_data[:16])
+            qr_height = _binary_to_int(header_data[16:])
+            logger.debug(f"Header ditemukan! Dimensi QR: {qr_width}x{qr_height}")
+        else:
+            # Cari terminator yang berakhir setelah posisi header seharusnya selesai
+            ones_in_window = np.convolve(header_bits, np.ones(HEADER_TERMINATOR_LEN, dtype=np.int64), 'valid')
+            if not ones_in_window[num_header_bits - HEADER_TERMINATOR_LEN + 1:].all():
+                # Error jika panjang header tidak sesuai
+                raise ValueError("Panjang header tidak sesuai setelah terminator ditemukan.")
+            if header_bits.size >= header_search_bits:
+                raise ValueError("Terminator header tidak ditemukan dalam batas wajar piksel.")
             raise ValueError("Gagal menemukan header QR Code dalam citra.")
 
         # 2. Hitung jumlah bit QR yang perlu diekstrak berdasarkan dimensi
         num_qr_bits_expected = qr_width * qr_height
         total_bits_expected = num_header_bits + num_qr_bits_expected
 
-        print(f"[*] Jumlah bit QR yang diharapkan: {num_qr_bits_expected}")
-        print(f"[*] Total bit yang diharapkan (header + QR): {total_bits_expected}")
-
-        # 3. Lanjutkan ekstraksi untuk data QR
-        qr_bits_list = []  # List untuk menampung bit QR
-        # Indeks piksel tempat ekstraksi header berhenti
-        start_pixel_index = pixels_processed
-
-        # Konversi indeks piksel linear ke koordinat (x, y) untuk melanjutkan
-        start_y = start_pixel_index // width
-        start_x = start_pixel_index % width
-
-        print(f"[*] Melanjutkan ekstraksi dari piksel ({start_x}, {start_y})")
+        # Tolak lebih awal citra tanpa QR: header nol atau QR yang tidak muat di citra
+        # tidak perlu membaca (dan menyalin) sisa piksel terlebih dahulu
+        if num_qr_bits_expected == 0:
+            raise ValueError("Gagal menemukan header QR Code dalam citra.")
+        available_bits = width * height - num_header_bits
+        if available_bits < num_qr_bits_expected:
+            raise ValueError(f"Data tidak cukup. Hanya {max(available_bits, 0)} dari {num_qr_bits_expected} bit QR yang bisa diekstrak.")
 
-        # Buat iterator piksel yang dimulai dari piksel setelah header
-        # dan berhenti setelah mengekstrak sejumlah bit yang diperlukan (num_qr_bits_expected)
-        pixel_iterator = itertools.islice(
-            ((x_, y_) for y_ in range(start_y, height) for x_ in range(width) if y_ > start_y or (y_ == start_y and x_ >= start_x)),
-            num_qr_bits_expected
-        )
+        logger.debug(f"Jumlah bit QR yang diharapkan: {num_qr_bits_expected}")
+        logger.debug(f"Total bit yang diharapkan (header + QR): {total_bits_expected}")
+        logger.debug(f"Melanjutkan ekstraksi dari piksel ({num_header_bits % width}, {num_header_bits // width})")
 
-        bits_extracted_count = 0  # Counter bit QR yang diekstrak
-        # Iterasi menggunakan iterator piksel yang sudah dibuat
-        for x, y in pixel_iterator:
-            r, g, b = stego_img.getpixel((x, y))
-            # Ekstrak LSB dari channel Biru dan tambahkan ke list
-            qr_bits_list.append(_extract_lsb(b))
-            bits_extracted_count += 1
+        # 3. Ekstrak bit QR yang berada tepat setelah header
+        qr_bits_arr = _read_blue_lsbs(stego_img, num_header_bits, num_qr_bits_expected)
+        bits_extracted_count = qr_bits_arr.size
 
-        print(f"[*] Jumlah bit QR yang berhasil diekstrak: {bits_extracted_count}")
+        logger.debug(f"Jumlah bit QR yang berhasil diekstrak: {bits_extracted_count}")
 
         # Cek apakah jumlah bit yang diekstrak sesuai harapan
         if bits_extracted_count < num_qr_bits_expected:
             raise ValueError(f"Data tidak cukup. Hanya {bits_extracted_count} dari {num_qr_bits_expected} bit QR yang bisa diekstrak.")
 
-        # Gabungkan list bit menjadi satu string
-        qr_bits = "".join(qr_bits_list)
-
         # 4. Rekonstruksi citra QR Code dari aliran bit
-        print("[*] Merekonstruksi citra QR Code...")
-        # Buat citra baru mode '1' (hitam/putih) dengan dimensi yang didapat dari header
-        reconstructed_qr = Image.new('1', (qr_width, qr_height))
-        bit_index = 0
-        # Iterasi koordinat citra QR yang akan dibuat
-        for y in range(qr_height):
-            for x in range(qr_width):
-                # Jika bit = '1' (representasi hitam), set piksel ke 0 (hitam di mode '1')
-                if qr_bits[bit_index] == '1':
-                    reconstructed_qr.putpixel((x, y), 0)
-                # Jika bit = '0' (representasi putih), set piksel ke 255 (putih di mode '1')
-                else:
-                    reconstructed_qr.putpixel((x, y), 255)
-                bit_index += 1
+        logger.debug("Merekonstruksi citra QR Code...")
+        # Bit 1 (representasi hitam) -> 0, bit 0 (representasi putih) -> 255
+        qr_pixels = np.where(qr_bits_arr.reshape(qr_height, qr_width) == 1, 0, 255).astype(np.uint8)
+        # Buat citra mode '1' (hitam/putih) dari array sekaligus, tanpa putpixel per piksel
+        reconstructed_qr = Image.fromarray(qr_pixels, 'L').convert('1')
 
         # Simpan citra QR hasil rekonstruksi
         reconstructed_qr.save(output_qr_path, "PNG")
-        print(f"[*] Citra QR Code hasil ekstraksi disimpan di: {output_qr_path}")
+        logger.debug(f"Citra QR Code hasil ekstraksi disimpan di: {output_qr_path}")
+
+        # Piksel yang sama dengan file tersimpan, agar pemanggil bisa langsung mendekode QR
+        return qr_pixels
 
     # Menangani error spesifik dan umum
     except FileNotFoundError as e:
-        print(f"[!] Error: {e}")
+        logger.error(f"Error: {e}")
         raise
     except ValueError as e:
-        print(f"[!] Error: {e}")
+        logger.error(f"Error: {e}")
         raise
     except Exception as e:
-        print(f"[!] Error saat proses extracting: {e}")
+        logger.error(f"Error saat proses extracting: {e}")
         raise
 
 
@@ -367,89 +529,106 @@ def extract_qr_from_image(stego_image_path: str, output_qr_path: str):
 # ENHANCED LSB STEGANOGRAPHY FUNCTIONS
 # ===================================================================
 
-def analyze_image_capacity(image_path: str) -> Dict:
+def _statistics_sample(img: Image.Image) -> Image.Image:
+    """
+    Strided subsample (every ANALYSIS_SAMPLE_STRIDE-th pixel per axis) used for image statistics.
+    
+    NEAREST resampling picks original pixels without smoothing, so mean/std of
+    the sample are unbiased estimates; small images are returned unchanged.
+    """
+    width, height = img.size
+    sample_size = (max(64, width // ANALYSIS_SAMPLE_STRIDE), max(64, height // ANALYSIS_SAMPLE_STRIDE))
+    if sample_size[0] >= width or sample_size[1] >= height:
+        return img
+    return img.resize(sample_size, Resampling.NEAREST)
+
+
+def _mean_brightness(img: Image.Image) -> float:
+    """
+    Mean over all channels, taken from a box-filtered Image.reduce() of the image.
+    
+    Box filtering averages every pixel into the reduced image, so its mean equals
+    the full-image mean (up to edge boxes) at a fraction of the statistics work.
+    Not used for std: smoothing would underestimate it.
+    """
+    width, height = img.size
+    factor = max(1, min(ANALYSIS_SAMPLE_STRIDE, width // 64, height // 64))
+    reduced = img.reduce(factor) if factor > 1 else img
+    channel_means = ImageStat.Stat(reduced).mean
+    return sum(channel_means) / len(channel_means)
+
+
+def _image_statistics(img: Image.Image) -> Tuple[float, float, float]:
+    """
+    Compute (mean, std) over all RGB samples plus blue-channel std in one pass.
+    
+    PIL.ImageStat derives per-channel count/sum/sum2 from Pillow's C histogram,
+    so no NumPy copy of the pixels is made; overall figures are pooled from
+    the per-channel sums.
+    """
+    stat = ImageStat.Stat(img)
+    n = sum(stat.count)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    
+    mean_all = sum(stat.sum) / n
+    variance_all = max(0.0, sum(stat.sum2) / n - mean_all * mean_all)
+    return mean_all, math.sqrt(variance_all), stat.stddev[2]
+
+
+def analyze_image_capacity(image_or_path: Union[str, Image.Image], include_quality: bool = True) -> Dict:
     """
     Analyze image capacity for QR embedding with detailed metrics.
     
+    Results for a path are memoized per (path, mtime, size), so repeated queries
+    against an unchanged cover image skip decoding entirely. Each call returns
+    its own copy. An already-opened image is analyzed directly, which lets
+    callers that need the pixels anyway decode the cover only once.
+    
     Args:
-        image_path (str): Path to the cover image
+        image_or_path (Union[str, Image.Image]): Path to the cover image or an opened image
+        include_quality (bool): Decode pixels for efficiency score and image
+            statistics. If False only the image header is read (capacity only).
         
     Returns:
         Dict: Comprehensive capacity analysis
     """
-    logger.info(f"Analyzing capacity for image: {image_path}")
+    if isinstance(image_or_path, Image.Image):
+        return _analyze_image_capacity(image_or_path, include_quality)
     
-    if not os.path.exists(image_path):
-        raise FileNotFoundError(f"Image not found: {image_path}")
+    try:
+        stat_result = os.stat(image_or_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Image not found: {image_or_path}")
+    
+    cached = _analyze_image_capacity_cached(image_or_path, stat_result.st_mtime_ns, stat_result.st_size,
+                                            include_quality)
+    return copy.deepcopy(cached)
+
+
+@lru_cache(maxsize=128)
+def _analyze_image_capacity_cached(image_path: str, mtime_ns: int, size: int,
+                                   include_quality: bool) -> Dict:
+    """Cached capacity analysis; mtime/size are part of the key so edits invalidate it."""
+    return _analyze_image_capacity(image_path, include_quality)
+
+
+def _analyze_image_capacity(image_or_path: Union[str, Image.Image], include_quality: bool) -> Dict:
+    """Uncached capacity analysis backing analyze_image_capacity."""
+    if isinstance(image_or_path, Image.Image):
+        logger.info(f"Analyzing capacity for image: {image_or_path.size[0]}x{image_or_path.size[1]} (in memory)")
+    else:
+        logger.info(f"Analyzing capacity for image: {image_or_path}")
     
     try:
-        # Load and analyze image
-        img = Image.open(image_path).convert('RGB')
-        width, height = img.size
-        
-        # Calculate basic metrics
-        total_pixels = width * height
-        usable_capacity = total_pixels  # Each pixel can hold 1 bit in blue channel
-        
-        # Header requirements (width + height + terminator)
-        header_bits = 16 + 16 + HEADER_TERMINATOR_LEN  # 40 bits total
-        available_for_qr = usable_capacity - header_bits
-        
-        # Calculate maximum QR size that can fit
-        max_qr_pixels = available_for_qr
-        max_qr_dimension = int(math.sqrt(max_qr_pixels))
-        
-        # Calculate recommended QR size (conservative approach)
-        # Use 70% of maximum capacity for better quality
-        recommended_qr_pixels = int(max_qr_pixels * 0.7)
-        recommended_qr_dimension = int(math.sqrt(recommended_qr_pixels))
-        
-        # Calculate efficiency score based on image properties
-        img_array = np.array(img)
-        
-        # Analyze image complexity (affects embedding quality)
-        # Calculate standard deviation as complexity measure
-        complexity_score = np.std(img_array[:, :, 2])  # Blue channel complexity
-        
-        # Efficiency score (0-100) based on capacity and complexity
-        # Higher capacity and lower complexity = higher efficiency
-        capacity_score = min(100, (available_for_qr / 100000) * 50)  # Scale capacity
-        complexity_penalty = min(50, complexity_score / 5)  # Penalty for high complexity
-        efficiency_score = max(0, capacity_score - complexity_penalty)
-        
-        # Calculate image quality metrics
-        mean_brightness = np.mean(img_array)
-        contrast_ratio = np.std(img_array) / np.mean(img_array) if np.mean(img_array) > 0 else 0
-        
-        analysis_result = {
-            "total_pixels": total_pixels,
-            "usable_capacity": usable_capacity,
-            "header_bits": header_bits,
-            "available_for_qr": available_for_qr,
-            "max_qr_size": {
-                "width": max_qr_dimension,
-                "height": max_qr_dimension,
-                "total_pixels": max_qr_dimension * max_qr_dimension
-            },
-            "recommended_qr_size": {
-                "width": recommended_qr_dimension,
-                "height": recommended_qr_dimension,
-                "total_pixels": recommended_qr_dimension * recommended_qr_dimension
-            },
-            "efficiency_score": round(efficiency_score, 1),
-            "image_properties": {
-                "dimensions": {"width": width, "height": height},
-                "mean_brightness": round(mean_brightness, 2),
-                "contrast_ratio": round(contrast_ratio, 3),
-                "blue_channel_complexity": round(complexity_score, 2)
-            },
-            "capacity_utilization": {
-                "max_utilization": round((max_qr_pixels / total_pixels) * 100, 1),
-                "recommended_utilization": round((recommended_qr_pixels / total_pixels) * 100, 1)
-            }
-        }
+        if isinstance(image_or_path, Image.Image):
+            analysis_result = _analyze_cover(image_or_path, include_quality)
+        else:
+            # Image.open only parses the header; pixels are decoded on convert()
+            with Image.open(image_or_path) as img:
+                analysis_result = _analyze_cover(img, include_quality)
         
-        logger.info(f"Capacity analysis complete. Available QR capacity: {available_for_qr} bits")
+        logger.info(f"Capacity analysis complete. Available QR capacity: {analysis_result['available_for_qr']} bits")
         return analysis_result
         
     except Exception as e:
@@ -457,13 +636,135 @@ def analyze_image_capacity(image_path: str) -> Dict:
         raise
 
 
-def optimize_qr_for_image(cover_image_path: str, qr_data_length: int) -> Dict:
+def _analyze_cover(img: Image.Image, include_quality: bool) -> Dict:
+    """Capacity metrics for an opened image, plus quality metrics if requested."""
+    analysis_result = _capacity_metrics(*img.size)
+    
+    if include_quality:
+        rgb_img = img if img.mode == 'RGB' else img.convert('RGB')
+        efficiency_score, quality_properties = _quality_metrics(rgb_img, analysis_result["available_for_qr"])
+        analysis_result["efficiency_score"] = efficiency_score
+        analysis_result["image_properties"].update(quality_properties)
+    
+    return analysis_result
+
+
+def _capacity_metrics(width: int, height: int) -> Dict:
+    """Capacity figures that depend only on image dimensions (no pixel data needed)."""
+    # Calculate basic metrics
+    total_pixels = width * height
+    usable_capacity = total_pixels  # Each pixel can hold 1 bit in blue channel
+    
+    # Header requirements (width + height + terminator)
+    header_bits = 16 + 16 + HEADER_TERMINATOR_LEN  # 40 bits total
+    available_for_qr = usable_capacity - header_bits
+    
+    # Calculate maximum QR size that can fit
+    max_qr_pixels = available_for_qr
+    max_qr_dimension = int(math.sqrt(max_qr_pixels))
+    
+    # Calculate recommended QR size (conservative approach)
+    # Use 70% of maximum capacity for better quality
+    recommended_qr_pixels = int(max_qr_pixels * 0.7)
+    recommended_qr_dimension = int(math.sqrt(recommended_qr_pixels))
+    
+    return {
+        "total_pixels": total_pixels,
+        "usable_capacity": usable_capacity,
+        "header_bits": header_bits,
+        "available_for_qr": available_for_qr,
+        "max_qr_size": {
+            "width": max_qr_dimension,
+            "height": max_qr_dimension,
+            "total_pixels": max_qr_dimension * max_qr_dimension
+        },
+        "recommended_qr_size": {
+            "width": recommended_qr_dimension,
+            "height": recommended_qr_dimension,
+            "total_pixels": recommended_qr_dimension * recommended_qr_dimension
+        },
+        "image_properties": {
+            "dimensions": {"width": width, "height": height}
+        },
+        "capacity_utilization": {
+            "max_utilization": round((max_qr_pixels / total_pixels) * 100, 1),
+            "recommended_utilization": round((recommended_qr_pixels / total_pixels) * 100, 1)
+        }
+    }
+
+
+def _efficiency_score(available_for_qr, complexity_score):
+    """
+    Efficiency score (0-100) from capacity and blue-channel complexity.
+    
+    Higher capacity and lower complexity = higher efficiency. Accepts scalars
+    or ndarrays; scalars come back as a float rounded to one decimal.
+    """
+    capacity_score = np.minimum(100, np.asarray(available_for_qr, dtype=np.float64) / 100000 * 50)  # Scale capacity
+    complexity_penalty = np.minimum(50, np.asarray(complexity_score, dtype=np.float64) / 5)  # Penalty for high complexity
+    efficiency = np.round(np.maximum(0, capacity_score - complexity_penalty), 1)
+    return float(efficiency) if efficiency.ndim == 0 else efficiency
+
+
+def _quality_metrics(img: Image.Image, available_for_qr: int) -> Tuple[float, Dict]:
+    """
+    Efficiency score and image statistics; requires decoded pixels.
+    
+    Returns:
+        Tuple[float, Dict]: (efficiency_score, image property statistics)
+    """
+    # Strided sample gives contrast and blue-channel complexity
+    # Standard deviation of the blue channel is used as complexity measure
+    _, overall_std, complexity_score = _image_statistics(_statistics_sample(img))
+    mean_brightness = _mean_brightness(img)
+    
+    efficiency_score = _efficiency_score(available_for_qr, complexity_score)
+    
+    # Calculate image quality metrics
+    contrast_ratio = overall_std / mean_brightness if mean_brightness > 0 else 0
+    
+    return efficiency_score, {
+        "mean_brightness": round(mean_brightness, 2),
+        "contrast_ratio": round(contrast_ratio, 3),
+        "blue_channel_complexity": round(complexity_score, 2)
+    }
+
+
+def _quality_from_density(density):
+    """
+    Predicted PSNR and quality level from embedding density.
+    
+    Accepts a scalar or an ndarray of densities; a batch is evaluated in one
+    NumPy call. Scalars come back as (float, str).
+    """
+    d = np.asarray(density, dtype=np.float64)
+    conds = [d < 0.1, d < 0.3, d < 0.5]
+    psnr = np.select(conds, [50 + (0.1 - d) * 100, 40 + (0.3 - d) * 50, 35 + (0.5 - d) * 25],
+                     default=np.maximum(25, 35 - (d - 0.5) * 20))
+    level = np.select(conds, ["Excellent", "Good", "Fair"], default="Poor")
+    if d.ndim == 0:
+        return float(psnr), str(level)
+    return psnr, level
+
+
+def _quality_level_from_psnr(psnr):
+    """Quality level for a scalar or ndarray of PSNR estimates (dB)."""
+    p = np.asarray(psnr, dtype=np.float64)
+    level = np.select([p > 45, p > 35, p > 25], ["Excellent", "Good", "Fair"], default="Poor")
+    return str(level) if p.ndim == 0 else level
+
+
+def optimize_qr_for_image(cover_image_path: str, qr_data_length: int,
+                          include_quality: bool = False) -> Dict:
     """
     Determine optimal QR size for given cover image based on data length.
     
     Args:
         cover_image_path (str): Path to cover image
         qr_data_length (int): Length of data to be encoded in QR
+        include_quality (bool): Also decode the cover to score its complexity, adding a
+            recommendation for high-complexity covers. By default only the image header
+            is read, which is all the sizing needs.
         
     Returns:
         Dict: Optimization recommendations
@@ -471,24 +772,12 @@ def optimize_qr_for_image(cover_image_path: str, qr_data_length: int) -> Dict:
     logger.info(f"Optimizing QR size for image: {cover_image_path}, data length: {qr_data_length}")
     
     # Get capacity analysis first
-    capacity_analysis = analyze_image_capacity(cover_image_path)
-    
-    # Estimate QR version requirements based on data length
-    # QR version capacity approximation (alphanumeric mode, error correction L)
-    qr_capacities = {
-        1: 25, 2: 47, 3: 77, 4: 114, 5: 154, 6: 195, 7: 224, 8: 279, 9: 335, 10: 395,
-        11: 468, 12: 535, 13: 619, 14: 667, 15: 758, 16: 854, 17: 938, 18: 1046, 19: 1153, 20: 1249
-    }
+    capacity_analysis = analyze_image_capacity(cover_image_path, include_quality=include_quality)
     
-    # Find minimum QR version needed
-    required_version = None
-    for version, capacity in qr_capacities.items():
-        if capacity >= qr_data_length:
-            required_version = version
-            break
-    
-    if required_version is None:
-        required_version = 20  # Maximum standard version
+    # Find minimum QR version needed (binary search over the capacity table);
+    # data beyond version 20 is capped at the maximum standard version
+    idx = int(np.searchsorted(_QR_CAPACITIES, qr_data_length, side='left'))
+    required_version = min(idx + 1, len(_QR_CAPACITIES))
     
     # Calculate QR module dimensions for required version
     qr_modules = 21 + (required_version - 1) * 4
@@ -511,18 +800,7 @@ def optimize_qr_for_image(cover_image_path: str, qr_data_length: int) -> Dict:
     embedding_density = (qr_modules * qr_modules) / capacity_analysis["total_pixels"]
     
     # Quality scoring
-    if embedding_density < 0.1:
-        quality_level = "Excellent"
-        predicted_psnr = 50 + (0.1 - embedding_density) * 100
-    elif embedding_density < 0.3:
-        quality_level = "Good"
-        predicted_psnr = 40 + (0.3 - embedding_density) * 50
-    elif embedding_density < 0.5:
-        quality_level = "Fair"
-        predicted_psnr = 35 + (0.5 - embedding_density) * 25
-    else:
-        quality_level = "Poor"
-        predicted_psnr = max(25, 35 - (embedding_density - 0.5) * 20)
+    predicted_psnr, quality_level = _quality_from_density(embedding_density)
     
     optimization_result = {
         "data_requirements": {
@@ -569,7 +847,7 @@ def optimize_qr_for_image(cover_image_path: str, qr_data_length: int) -> Dict:
         optimization_result["recommendations"].append("Consider using a larger cover image for better quality")
     if optimal_module_size < 4:
         optimization_result["recommendations"].append("QR code may be difficult to scan, consider reducing data length")
-    if capacity_analysis["efficiency_score"] < 50:
+    if include_quality and capacity_analysis["efficiency_score"] < 50:
         optimization_result["recommendations"].append("Cover image has high complexity, quality may be affected")
     if optimization_result["quality_prediction"]["quality_level"] == "Excellent":
         optimization_result["recommendations"].append("Optimal configuration for high-quality embedding")
@@ -582,30 +860,35 @@ def check_qr_compatibility(cover_image_path: str, qr_image_path: str) -> Dict:
     """
     Check if QR can be embedded in cover image with quality metrics.
     
+    The cover pixels are decoded only when the pair is compatible; for an
+    incompatible pair only the image headers are read.
+    
     Args:
         cover_image_path (str): Path to cover image
         qr_image_path (str): Path to QR code image
         
     Returns:
-        Dict: Compatibility analysis with quality predictions
+        Dict: Compatibility analysis with quality predictions. For an incompatible
+        pair image_properties["cover_efficiency"] is None (no quality metrics),
+        like the None estimates in quality_prediction.
     """
     logger.info(f"Checking compatibility: {cover_image_path} + {qr_image_path}")
     
-    if not os.path.exists(cover_image_path):
+    # No separate exists() checks: the stat/open calls below raise FileNotFoundError themselves
+    try:
+        # Get capacity analysis (dimensions only for now; pixels are decoded once compatibility is known)
+        capacity_analysis = analyze_image_capacity(cover_image_path, include_quality=False)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Cover image not found: {cover_image_path}")
-    if not os.path.exists(qr_image_path):
+    try:
+        with Image.open(qr_image_path) as qr_img:  # header only
+            qr_width, qr_height = qr_img.size
+    except FileNotFoundError:
         raise FileNotFoundError(f"QR image not found: {qr_image_path}")
     
     try:
-        # Load images
-        cover_img = Image.open(cover_image_path).convert('RGB')
-        qr_img = Image.open(qr_image_path).convert('1')
-        
-        cover_width, cover_height = cover_img.size
-        qr_width, qr_height = qr_img.size
-        
-        # Get capacity analysis
-        capacity_analysis = analyze_image_capacity(cover_image_path)
+        cover_width = capacity_analysis["image_properties"]["dimensions"]["width"]
+        cover_height = capacity_analysis["image_properties"]["dimensions"]["height"]
         
         # Calculate requirements
         qr_pixels = qr_width * qr_height
@@ -619,13 +902,8 @@ def check_qr_compatibility(cover_image_path: str, qr_image_path: str) -> Dict:
         
         # Calculate quality predictions
         if compatible:
-            # Simulate embedding process for quality estimation
-            cover_array = np.array(cover_img)
-            blue_channel = cover_array[:, :, 2].astype(np.float64)
-            
-            # Calculate baseline statistics
-            original_mean = np.mean(blue_channel)
-            original_std = np.std(blue_channel)
+            # Quality metrics need decoded pixels (memoized per file, like the header-only pass)
+            capacity_analysis = analyze_image_capacity(cover_image_path)
             
             # Estimate changes from LSB modification
             # Assume worst case: 50% of LSBs change
@@ -639,7 +917,8 @@ def check_qr_compatibility(cover_image_path: str, qr_image_path: str) -> Dict:
             # Estimate PSNR
             max_pixel_value = 255.0
             if estimated_mse > 0:
-                estimated_psnr = 20 * math.log10(max_pixel_value / math.sqrt(estimated_mse))
+                # 10*log10(MAX^2/MSE) == 20*log10(MAX/sqrt(MSE)), without the sqrt
+                estimated_psnr = 10 * math.log10((max_pixel_value * max_pixel_value) / estimated_mse)
             else:
                 estimated_psnr = float('inf')
             
@@ -650,9 +929,7 @@ def check_qr_compatibility(cover_image_path: str, qr_image_path: str) -> Dict:
             quality_prediction = {
                 "mse_estimate": round(estimated_mse, 4),
                 "psnr_estimate": round(min(estimated_psnr, 60.0), 1),  # Cap at reasonable maximum
-                "quality_level": "Excellent" if estimated_psnr > 45 else 
-                               "Good" if estimated_psnr > 35 else 
-                               "Fair" if estimated_psnr > 25 else "Poor"
+                "quality_level": _quality_level_from_psnr(estimated_psnr)
             }
         else:
             quality_prediction = {
@@ -697,7 +974,7 @@ def check_qr_compatibility(cover_image_path: str, qr_image_path: str) -> Dict:
         if utilization > 50:
             recommendations.append("High capacity utilization may affect image quality")
         
-        if capacity_analysis["image_properties"]["blue_channel_complexity"] > 30:
+        if compatible and capacity_analysis["image_properties"]["blue_channel_complexity"] > 30:
             recommendations.append("Cover image has high complexity in blue channel")
         
         compatibility_result = {
@@ -715,7 +992,7 @@ def check_qr_compatibility(cover_image_path: str, qr_image_path: str) -> Dict:
             "image_properties": {
                 "cover_size": {"width": cover_width, "height": cover_height},
                 "qr_size": {"width": qr_width, "height": qr_height},
-                "cover_efficiency": capacity_analysis["efficiency_score"]
+                "cover_efficiency": capacity_analysis.get("efficiency_score")
             },
             "recommendations": recommendations,
             "processing_time": time.time()
@@ -729,6 +1006,77 @@ def check_qr_compatibility(cover_image_path: str, qr_image_path: str) -> Dict:
         raise
 
 
+_RESIZE_ALGORITHMS = {
+    'nearest': Resampling.NEAREST,
+    'lanczos': Resampling.LANCZOS,
+    'bicubic': Resampling.BICUBIC,
+    'bilinear': Resampling.BILINEAR
+}
+
+
+def _resolve_resize_algorithm(algorithm: str) -> Tuple[str, Resampling]:
+    """Map an algorithm name to its resampling filter, falling back to Lanczos."""
+    if algorithm not in _RESIZE_ALGORITHMS:
+        algorithm = 'lanczos'  # Default to Lanczos
+        logger.warning(f"Unknown algorithm, using Lanczos")
+    return algorithm, _RESIZE_ALGORITHMS[algorithm]
+
+
+def enhanced_resize_qr_into(qr_img: Image.Image, target_size: Tuple[int, int], out: np.ndarray,
+                            algorithm: str = "lanczos") -> np.ndarray:
+    """
+    Resize a QR image and write its pixels into a caller-supplied buffer.
+    
+    For callers that only need raw pixel values (e.g. bits for LSB embedding)
+    and resize repeatedly: reusing the same buffer avoids allocating a result
+    image per call. Mode '1' images are written as 0/1.
+    
+    Args:
+        qr_img (Image.Image): QR code image to resize
+        target_size (Tuple[int, int]): Target (width, height)
+        out (np.ndarray): Destination array with shape (height, width)
+        algorithm (str): Resize algorithm ('nearest', 'lanczos', 'bicubic', 'bilinear')
+        
+    Returns:
+        np.ndarray: out, filled with the resized pixels
+    """
+    width, height = target_size
+    if out.shape[:2] != (height, width):
+        raise ValueError(f"Output buffer shape {out.shape} does not match target size {target_size}")
+    
+    _, resampling_method = _resolve_resize_algorithm(algorithm)
+    resized = qr_img.resize(target_size, resampling_method)
+    out[...] = np.asarray(resized, dtype=out.dtype)
+    return out
+
+
+# Algorithm-specific readability adjustments
+_RESIZE_QUALITY_BONUS = {
+    'lanczos': 5,
+    'bicubic': 3,
+    'bilinear': 1,
+    'nearest': -2
+}
+
+
+def _readability_from_resize(size_change_ratio, algorithm: str = "lanczos"):
+    """
+    Predicted QR readability (0-100) and quality level after a resize.
+    
+    Accepts a scalar or an ndarray of size-change ratios; scalars come back as
+    (float, str).
+    """
+    r = np.asarray(size_change_ratio, dtype=np.float64)
+    conds = [r > 1, r > 0.5, r > 0.25]
+    score = np.select(conds, [np.minimum(100, 90 + (r - 1) * 10), 80 + (r - 0.5) * 20, 60 + (r - 0.25) * 80],
+                      default=np.maximum(20, 60 * r / 0.25))
+    level = np.select(conds, ["Enhanced", "Good", "Fair"], default="Poor")
+    score = np.clip(score + _RESIZE_QUALITY_BONUS.get(algorithm, 0), 0, 100)
+    if r.ndim == 0:
+        return float(score), str(level)
+    return score, level
+
+
 def enhanced_resize_qr(qr_img: Image.Image, target_size: Tuple[int, int], 
                       algorithm: str = "lanczos") -> Dict:
     """
@@ -747,18 +1095,7 @@ def enhanced_resize_qr(qr_img: Image.Image, target_size: Tuple[int, int],
     original_size = qr_img.size
     
     # Select resampling algorithm
-    algorithm_map = {
-        'nearest': Resampling.NEAREST,
-        'lanczos': Resampling.LANCZOS,
-        'bicubic': Resampling.BICUBIC,
-        'bilinear': Resampling.BILINEAR
-    }
-    
-    if algorithm not in algorithm_map:
-        algorithm = 'lanczos'  # Default to Lanczos
-        logger.warning(f"Unknown algorithm, using Lanczos")
-    
-    resampling_method = algorithm_map[algorithm]
+    algorithm, resampling_method = _resolve_resize_algorithm(algorithm)
     
     try:
         # Perform resize
@@ -772,30 +1109,8 @@ def enhanced_resize_qr(qr_img: Image.Image, target_size: Tuple[int, int],
         
         size_change_ratio = resized_pixels / original_pixels
         
-        # Predict readability based on size change
-        if size_change_ratio > 1:
-            readability_score = min(100, 90 + (size_change_ratio - 1) * 10)
-            quality_level = "Enhanced"
-        elif size_change_ratio > 0.5:
-            readability_score = 80 + (size_change_ratio - 0.5) * 20
-            quality_level = "Good"
-        elif size_change_ratio > 0.25:
-            readability_score = 60 + (size_change_ratio - 0.25) * 80
-            quality_level = "Fair"
-        else:
-            readability_score = max(20, 60 * size_change_ratio / 0.25)
-            quality_level = "Poor"
-        
-        # Algorithm-specific quality adjustments
-        algorithm_quality_bonus = {
-            'lanczos': 5,
-            'bicubic': 3,
-            'bilinear': 1,
-            'nearest': -2
-        }
-        
-        readability_score += algorithm_quality_bonus.get(algorithm, 0)
-        readability_score = max(0, min(100, readability_score))
+        # Predict readability based on size change, with algorithm-specific adjustment
+        readability_score, quality_level = _readability_from_resize(size_change_ratio, algorithm)
         
         resize_result = {
             "resized_image": resized_qr,
@@ -832,13 +1147,31 @@ def enhanced_resize_qr(qr_img: Image.Image, target_size: Tuple[int, int],
         raise
 
 
-def batch_analyze_images(image_paths: list, output_format: str = "summary") -> Dict:
+def _decode_cover_for_analysis(image_path: str) -> Image.Image:
+    """Decode stage of the batch pipeline: read a cover image and decode it to RGB."""
+    try:
+        with Image.open(image_path) as img:
+            return img.convert('RGB')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Image not found: {image_path}")
+
+
+def batch_analyze_images(image_paths: list, output_format: str = "summary",
+                         max_workers: Optional[int] = None) -> Dict:
     """
     Batch processing for multiple image capacity analysis.
     
+    Images go through a two-stage pipeline: decoder threads read and decode
+    covers into a bounded queue while analysis threads compute statistics, so
+    file I/O overlaps with the statistics pass and at most a few decoded images
+    are held in memory at once. Pillow releases the GIL in both stages.
+    
     Args:
         image_paths (list): List of image paths to analyze
-        output_format (str): "summary" or "detailed"
+        output_format (str): "summary", "detailed" or "arrays". "arrays" returns
+            results as parallel NumPy columns instead of one dict per image
+        max_workers (Optional[int]): Analysis threads (default: os.cpu_count());
+            twice as many decoder threads are used
         
     Returns:
         Dict: Batch analysis results
@@ -855,56 +1188,109 @@ def batch_analyze_images(image_paths: list, output_format: str = "summary") -> D
     }
     
     start_time = time.time()
-    capacities = []
-    efficiency_scores = []
     
-    for i, image_path in enumerate(image_paths):
+    # Per-image metrics as parallel arrays (structure of arrays)
+    n_images = len(image_paths)
+    capacities = np.zeros(n_images, dtype=np.int64)
+    efficiency_scores = np.zeros(n_images, dtype=np.float64)
+    succeeded = np.zeros(n_images, dtype=bool)
+    
+    n_workers = max_workers or os.cpu_count() or 1
+    outcomes: List[Union[Dict, Exception, None]] = [None] * len(image_paths)
+    decoded = queue.Queue(maxsize=2 * n_workers)
+    
+    def _decode(index: int, image_path: str) -> None:
         try:
-            logger.info(f"Processing image {i+1}/{len(image_paths)}: {image_path}")
-            
-            analysis = analyze_image_capacity(image_path)
-            
-            if output_format == "detailed":
-                batch_results["results"].append({
-                    "image_path": image_path,
-                    "analysis": analysis,
-                    "status": "success"
-                })
-            else:
+            decoded.put((index, _decode_cover_for_analysis(image_path)))
+        except Exception as e:
+            decoded.put((index, e))
+    
+    def _analyze() -> None:
+        while True:
+            item = decoded.get()
+            if item is None:
+                return
+            index, payload = item
+            if isinstance(payload, Exception):
+                outcomes[index] = payload
+                continue
+            try:
+                outcomes[index] = analyze_image_capacity(payload)
+            except Exception as e:
+                outcomes[index] = e
+    
+    with ThreadPoolExecutor(max_workers=n_workers) as analysis_pool:
+        for _ in range(n_workers):
+            analysis_pool.submit(_analyze)
+        with ThreadPoolExecutor(max_workers=2 * n_workers) as decode_pool:
+            for index, image_path in enumerate(image_paths):
+                decode_pool.submit(_decode, index, image_path)
+        # All covers decoded and queued; one sentinel per analysis thread
+        for _ in range(n_workers):
+            decoded.put(None)
+    
+    # Collect in input order so results stay aligned with image_paths
+    for i, (image_path, analysis) in enumerate(zip(image_paths, outcomes)):
+        if isinstance(analysis, Exception):
+            logger.error(f"Failed to analyze {image_path}: {str(analysis)}")
+            if output_format != "arrays":
                 batch_results["results"].append({
                     "image_path": image_path,
-                    "available_capacity": analysis["available_for_qr"],
-                    "efficiency_score": analysis["efficiency_score"],
-                    "recommended_qr_size": analysis["recommended_qr_size"],
-                    "status": "success"
+                    "error": str(analysis),
+                    "status": "failed"
                 })
-            
-            capacities.append(analysis["available_for_qr"])
-            efficiency_scores.append(analysis["efficiency_score"])
-            batch_results["successful_analyses"] += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to analyze {image_path}: {str(e)}")
+            batch_results["failed_analyses"] += 1
+            continue
+        
+        logger.info(f"Processed image {i+1}/{len(image_paths)}: {image_path}")
+        
+        capacities[i] = analysis["available_for_qr"]
+        efficiency_scores[i] = analysis["efficiency_score"]
+        succeeded[i] = True
+        batch_results["successful_analyses"] += 1
+        
+        if output_format == "arrays":
+            continue
+        if output_format == "detailed":
             batch_results["results"].append({
                 "image_path": image_path,
-                "error": str(e),
-                "status": "failed"
+                "analysis": analysis,
+                "status": "success"
             })
-            batch_results["failed_analyses"] += 1
+        else:
+            batch_results["results"].append({
+                "image_path": image_path,
+                "available_capacity": analysis["available_for_qr"],
+                "efficiency_score": analysis["efficiency_score"],
+                "recommended_qr_size": analysis["recommended_qr_size"],
+                "status": "success"
+            })
+    
+    if output_format == "arrays":
+        batch_results["results"] = {
+            "image_path": np.array(image_paths, dtype=object),
+            "available_capacity": capacities,
+            "efficiency_score": efficiency_scores,
+            "success": succeeded
+        }
     
     # Calculate summary statistics
-    if capacities:
+    if succeeded.any():
+        cap_arr = capacities[succeeded]
+        eff_arr = efficiency_scores[succeeded]
+        # Upper median via selection (O(N)) instead of a full sort
+        mid = len(cap_arr) // 2
         batch_results["summary_statistics"] = {
             "capacity_stats": {
-                "min": min(capacities),
-                "max": max(capacities),
-                "mean": sum(capacities) / len(capacities),
-                "median": sorted(capacities)[len(capacities)//2]
+                "min": int(cap_arr.min()),
+                "max": int(cap_arr.max()),
+                "mean": float(cap_arr.mean()),
+                "median": int(np.partition(cap_arr, mid)[mid])
             },
             "efficiency_stats": {
-                "min": min(efficiency_scores),
-                "max": max(efficiency_scores),
-                "mean": sum(efficiency_scores) / len(efficiency_scores)
+                "min": float(eff_arr.min()),
+                "max": float(eff_arr.max()),
+                "mean": float(eff_arr.mean())
             }
         }
     
@@ -1,21 +1,52 @@
-import argparse
 import os
 import sys
-from typing import List
+from io import BytesIO
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from PIL import Image
+import numpy as np
 import docx
-from io import BytesIO
+from docx.oxml.ns import qn
 import uuid
 import shutil
+import threading
+import atexit
+import multiprocessing
+from collections import deque
 import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Import modul lokal
-from qr_utils import generate_qr, read_qr
-from lsb_steganography import embed_qr_to_image, extract_qr_from_image
+from qr_utils import generate_qr, read_qr_from_array, generate_qr_with_analysis
+from lsb_steganography import embed_qr_to_images_batch, extract_qr_from_image
+
+try:
+    from secure_qr_utils import SecureQRGenerator
+except ImportError:  # fitur QR aman bersifat opsional
+    SecureQRGenerator = None
+
+# Jumlah maksimum gambar per batch watermark (QR didekode sekali per batch)
+WATERMARK_BATCH_SIZE = 8
+
+# Jumlah tugas yang boleh antre di pool per worker; tugas berikutnya baru diambil (gambar
+# berikutnya baru diekstrak) setelah hasil tugas tertua diserahkan ke pemanggil
+POOL_TASKS_PER_WORKER = 2
+
+# Pool proses bersama untuk watermark/ekstraksi, dibuat saat pertama dibutuhkan
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+# Worker dimulai tanpa fork biasa (lihat _get_process_pool)
+_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Thread penghapus direktori temp yang masih berjalan (ditunggu saat interpreter keluar)
+_pending_cleanup: List[threading.Thread] = []
 
 
 def parse_arguments():
     """Parse command line arguments."""
+    # Imported here: modules that only import the watermark functions never need argparse
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='QR Code Watermarking tools menggunakan LSB steganography',
         formatter_class=argparse.RawTextHelpFormatter
@@ -74,47 +105,63 @@ def generate_qr_code(data: str, output_path: str) -> bool:
         return False
 
 
-def extract_images_from_docx(docx_path: str, output_dir: str) -> List[str]:
+def _docx_image_rels(doc) -> list:
     """
-    Extract all images from a docx file and save them to output directory.
+    Return the image relationships of an opened docx document, in relationship order.
+
+    Image n of the document is image_rels[n]; extraction ("image_<n>.png") and
+    replacement both index into this one list.
+    """
+    return [rel for rel in doc.part.rels.values() if "image" in rel.target_ref]
+
+
+def iter_image_blobs_from_docx(docx_path: str, image_rels: Optional[list] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield the images of a docx file as in-memory blobs, without writing anything.
 
     Args:
         docx_path: Path to the .docx file
-        output_dir: Directory to save extracted images
+        image_rels: Image relationships of the already opened document (see _docx_image_rels);
+            when given, docx_path is not opened again
 
-    Returns:
-        List[str]: List of paths to the extracted images
+    Yields:
+        Tuple[str, bytes]: (file name "image_<n>.png", image bytes), in relationship order
     """
-    try:
-        # Make sure the output directory exists
-        os.makedirs(output_dir, exist_ok=True)
+    if image_rels is None:
+        image_rels = _docx_image_rels(docx.Document(docx_path))
 
-        # Open the document
-        doc = docx.Document(docx_path)
+    for image_index, rel in enumerate(image_rels):
+        yield f"image_{image_index}.png", rel.target_part.blob
 
-        # Initialize an empty list for image paths
-        image_paths = []
 
-        # Loop through all the document parts that could contain images
-        image_count = 0
-        for rel in doc.part.rels.values():
-            if "image" in rel.target_ref:
-                # Get the image data
-                image_data = rel.target_part.blob
+def _write_image_blobs(image_blobs: Iterable[Tuple[str, bytes]], output_dir: str) -> Iterator[str]:
+    """Write (file name, bytes) blobs to output_dir one at a time, yielding each path once written."""
+    # Make sure the output directory exists
+    os.makedirs(output_dir, exist_ok=True)
 
-                # Create a file name for the image
-                image_filename = f"image_{image_count}.png"
-                image_path = os.path.join(output_dir, image_filename)
+    for image_filename, image_data in image_blobs:
+        image_path = os.path.join(output_dir, image_filename)
+        with open(image_path, "wb") as f:
+            f.write(image_data)
+        yield image_path
 
-                # Save the image
-                with open(image_path, "wb") as f:
-                    f.write(image_data)
 
-                image_paths.append(image_path)
-                image_count += 1
+def extract_images_from_docx(docx_path: str, output_dir: str) -> List[str]:
+    """
+    Extract all images from a docx file and save them to output directory.
+
+    Args:
+        docx_path: Path to the .docx file
+        output_dir: Directory to save extracted images
+
+    Returns:
+        List[str]: List of paths to the extracted images
+    """
+    try:
+        image_paths = list(_write_image_blobs(iter_image_blobs_from_docx(docx_path), output_dir))
 
-        if image_count > 0:
-            print(f"[*] Berhasil mengekstrak {image_count} gambar dari dokumen")
+        if image_paths:
+            print(f"[*] Berhasil mengekstrak {len(image_paths)} gambar dari dokumen")
         else:
             print("[!] Tidak ada gambar yang ditemukan dalam dokumen")
 
@@ -124,26 +171,26 @@ def extract_images_from_docx(docx_path: str, output_dir: str) -> List[str]:
         return []
 
 
-def extract_images_from_pdf(pdf_path: str, output_dir: str) -> List[str]:
+# PDF image stream formats passed through unchanged (Pillow and browsers read them
+# directly), mapped to the file extension they are saved under
+_PDF_DIRECT_IMAGE_EXTS = {"jpeg": "jpg", "jpg": "jpg"}
+
+
+def iter_image_blobs_from_pdf(pdf_path: str) -> Iterator[Tuple[str, bytes]]:
     """
-    Extract all images from a PDF file and save them to output directory.
+    Yield the images of a PDF file as in-memory blobs, one at a time, without writing anything.
 
     Args:
         pdf_path: Path to the .pdf file
-        output_dir: Directory to save extracted images
 
-    Returns:
-        List[str]: List of paths to the extracted images
+    Yields:
+        Tuple[str, bytes]: (file name "image_<n>.<ext>", image bytes), in page order. PNG,
+        except gray/RGB JPEG streams without a /Decode array, which are passed through
+        unchanged as "image_<n>.jpg"
     """
+    # Open the PDF document
+    doc = fitz.open(pdf_path)
     try:
-        # Make sure the output directory exists
-        os.makedirs(output_dir, exist_ok=True)
-
-        # Open the PDF document
-        doc = fitz.open(pdf_path)
-
-        # Initialize an empty list for image paths
-        image_paths = []
         image_count = 0
 
         # Loop through all pages
@@ -161,45 +208,105 @@ def extract_images_from_pdf(pdf_path: str, output_dir: str) -> List[str]:
                 image_bytes = base_image["image"]
                 image_ext = base_image["ext"]
                 
-                # Convert to PNG if not already PNG
-                if image_ext.lower() != "png":
-                    # Open with PIL and convert to PNG
-                    image = Image.open(BytesIO(image_bytes))
-                    image_filename = f"image_{image_count}.png"
-                    image_path = os.path.join(output_dir, image_filename)
-                    image.save(image_path, "PNG")
+                image_ext = image_ext.lower()
+                if image_ext == "png" or (image_ext in _PDF_DIRECT_IMAGE_EXTS
+                                          and base_image["colorspace"] in (1, 3) and base_image["bpc"] == 8
+                                          and doc.xref_get_key(xref, "Decode")[0] == "null"):
+                    # PNG, and gray/RGB JPEG that Pillow decodes as-is: keep the stream bytes
+                    # under their own extension, no decode/re-encode. A /Decode array remaps the
+                    # colours (e.g. inverts them), which only the MuPDF path below applies
+                    image_filename = f"image_{image_count}.{_PDF_DIRECT_IMAGE_EXTS.get(image_ext, 'png')}"
                 else:
-                    # Save directly as PNG
+                    # Let MuPDF decode the stream and encode PNG directly (no PIL round-trip);
+                    # CMYK and other 4+ colour-channel pixmaps are converted to RGB first
                     image_filename = f"image_{image_count}.png"
-                    image_path = os.path.join(output_dir, image_filename)
-                    with open(image_path, "wb") as f:
-                        f.write(image_bytes)
+                    pix = fitz.Pixmap(doc, xref)
+                    if pix.n - pix.alpha >= 4:
+                        pix = fitz.Pixmap(fitz.csRGB, pix)
+                    image_bytes = pix.tobytes("png")
+                    pix = None
 
-                image_paths.append(image_path)
                 image_count += 1
+                yield image_filename, image_bytes
+    finally:
+        doc.close()
+
+
+def iter_images_from_pdf(pdf_path: str, output_dir: str) -> Iterator[str]:
+    """
+    Extract images from a PDF file one at a time, saving each to output directory.
 
-        if image_count > 0:
-            print(f"[*] Berhasil mengekstrak {image_count} gambar dari PDF")
+    Images are written lazily as the caller iterates, so a caller can process and
+    release each image before the next one is extracted.
+
+    Args:
+        pdf_path: Path to the .pdf file
+        output_dir: Directory to save extracted images
+
+    Yields:
+        str: Path to each extracted image, named as in iter_image_blobs_from_pdf
+        (".png", or ".jpg" for JPEG streams passed through unchanged)
+    """
+    return _write_image_blobs(iter_image_blobs_from_pdf(pdf_path), output_dir)
+
+
+def count_images_in_pdf(pdf_path: str) -> int:
+    """Count the images iter_image_blobs_from_pdf would yield, without extracting any."""
+    with fitz.open(pdf_path) as doc:
+        return sum(len(page.get_images(full=True)) for page in doc)
+
+
+def extract_images_from_pdf(pdf_path: str, output_dir: str) -> List[str]:
+    """
+    Extract all images from a PDF file and save them to output directory.
+
+    Args:
+        pdf_path: Path to the .pdf file
+        output_dir: Directory to save extracted images
+
+    Returns:
+        List[str]: List of paths to the extracted images. Gray/RGB JPEG images are
+        saved unchanged as ".jpg", all others as ".png" (see iter_image_blobs_from_pdf)
+    """
+    try:
+        image_paths = list(iter_images_from_pdf(pdf_path, output_dir))
+
+        if image_paths:
+            print(f"[*] Berhasil mengekstrak {len(image_paths)} gambar dari PDF")
         else:
             print("[!] Tidak ada gambar yang ditemukan dalam PDF")
 
-        doc.close()
         return image_paths
     except Exception as e:
         print(f"[!] Error saat mengekstrak gambar dari PDF: {str(e)}")
         return []
 
 
+# Relationship attributes through which document XML references an image part
+_IMAGE_REL_ATTRS = (qn('r:embed'), qn('r:link'), qn('r:id'))
+
+
+def _read_image_data(image: Union[str, bytes]) -> bytes:
+    """Return image bytes as-is, or read them from the file when given a path."""
+    if isinstance(image, bytes):
+        return image
+    with open(image, "rb") as f:
+        return f.read()
+
+
 def replace_images_in_docx(docx_path: str, original_images: List[str],
-                          watermarked_images: List[str], output_path: str) -> bool:
+                          watermarked_images: List[Union[str, bytes]], output_path: str,
+                          doc=None, image_rels: Optional[list] = None) -> bool:
     """
     Replace images in a docx document with watermarked versions.
 
     Args:
         docx_path: Path to the original .docx file
         original_images: List of paths to the original images
-        watermarked_images: List of paths to the watermarked images
+        watermarked_images: List of watermarked images, as file paths or PNG bytes
         output_path: Path to save the new document
+        doc: The already opened document to modify and save instead of reopening docx_path
+        image_rels: Image relationships of doc (see _docx_image_rels), if already collected
 
     Returns:
         bool: True if successful, False otherwise
@@ -211,71 +318,71 @@ def replace_images_in_docx(docx_path: str, original_images: List[str],
             image_map[os.path.basename(orig)] = watermarked
 
         # Make a copy of the document
-        doc = docx.Document(docx_path)
+        if doc is None:
+            doc = docx.Document(docx_path)
+        if image_rels is None:
+            image_rels = _docx_image_rels(doc)
 
-        # Loop through all the document parts that could contain images
+        # Loop through the image relationships; image n is always "image_<n>.png"
         images_replaced = 0
-        for rel in doc.part.rels.values():
-            if "image" in rel.target_ref:
-                rel_id = rel.rId
-                target_ref = rel.target_ref
-                image_name = target_ref.split("/")[-1]
-
-                # Check if we have a watermarked version of this image
-                base_image_name = f"image_{images_replaced}.png"
-                if base_image_name in [os.path.basename(img) for img in image_map.keys()]:
-                    watermarked_path = image_map[base_image_name]
-
-                    # Read the watermarked image
-                    with open(watermarked_path, "rb") as f:
-                        watermarked_data = f.read()
-
-                    # Replace the image in the document
-                    # Since we can't set blob directly, we need to modify the part differently
-                    try:
-                        # Method 1: Try to modify part's _blob attribute (not recommended but works in some versions)
-                        if hasattr(rel.target_part, '_blob'):
-                            rel.target_part._blob = watermarked_data
-                            images_replaced += 1
-                        # Method 2: Create a new part and replace the old one
-                        else:
-                            # Get the content type of the image
-                            content_type = rel.target_part.content_type
-                            
-                            # Create a new image part with the watermarked data
-                            new_img_part = doc.part.package.blob_storage.new_part(
-                                content_type, 
-                                doc.part.package.next_partname(f"/word/media/image{uuid.uuid4().hex}.png")
-                            )
-                            
-                            # Write the watermarked data to the new part
-                            with new_img_part.open('wb') as f:
-                                f.write(watermarked_data)
-                                
-                            # Update the relationship to point to the new part
-                            doc.part.rels[rel_id].target_part = new_img_part
-                            images_replaced += 1
-                    except Exception as img_e:
-                        print(f"[!] Warning: Error mengganti gambar: {str(img_e)}")
-                        # Try alternative method
-                        try:
-                            # Method 3: Create a new relationship and delete the old one
-                            # Get original part name for reference
-                            original_part_name = rel.target_part.partname
-                            
-                            # Add a new image part with the watermarked data
-                            new_rid = doc.part.add_image(watermarked_data)
-                            
-                            # Find all references to the old rId and replace with new_rid
-                            for element in doc.element.body.iter():
-                                if hasattr(element, 'attrib'):
-                                    for key, value in element.attrib.items():
-                                        if value == rel_id:
-                                            element.attrib[key] = new_rid
+        for image_index, rel in enumerate(image_rels):
+            rel_id = rel.rId
+            target_ref = rel.target_ref
+            image_name = target_ref.split("/")[-1]
+
+            # Check if we have a watermarked version of this image
+            base_image_name = f"image_{image_index}.png"
+            if base_image_name in image_map:
+                # Read the watermarked image (no file access when given bytes)
+                watermarked_data = _read_image_data(image_map[base_image_name])
+
+                # Replace the image in the document
+                # Since we can't set blob directly, we need to modify the part differently
+                try:
+                    # Method 1: Try to modify part's _blob attribute (not recommended but works in some versions)
+                    if hasattr(rel.target_part, '_blob'):
+                        rel.target_part._blob = watermarked_data
+                        images_replaced += 1
+                    # Method 2: Create a new part and replace the old one
+                    else:
+                        # Get the content type of the image
+                        content_type = rel.target_part.content_type
+                        
+                        # Create a new image part with the watermarked data
+                        new_img_part = doc.part.package.blob_storage.new_part(
+                            content_type, 
+                            doc.part.package.next_partname(f"/word/media/image{uuid.uuid4().hex}.png")
+                        )
+                        
+                        # Write the watermarked data to the new part
+                        with new_img_part.open('wb') as f:
+                            f.write(watermarked_data)
                             
-                            images_replaced += 1
-                        except Exception as alt_e:
-                            print(f"[!] Warning: Alternative method juga gagal: {str(alt_e)}")
+                        # Update the relationship to point to the new part
+                        doc.part.rels[rel_id].target_part = new_img_part
+                        images_replaced += 1
+                except Exception as img_e:
+                    print(f"[!] Warning: Error mengganti gambar: {str(img_e)}")
+                    # Try alternative method
+                    try:
+                        # Method 3: Create a new relationship and delete the old one
+                        # Get original part name for reference
+                        original_part_name = rel.target_part.partname
+                        
+                        # Add a new image part with the watermarked data
+                        new_rid = doc.part.add_image(watermarked_data)
+                        
+                        # Find the image references to the old rId (a:blip r:embed/r:link,
+                        # VML r:id) with one XPath query and point them at new_rid
+                        for element in doc.element.body.xpath(
+                                f'.//*[@r:embed="{rel_id}" or @r:link="{rel_id}" or @r:id="{rel_id}"]'):
+                            for attr in _IMAGE_REL_ATTRS:
+                                if element.get(attr) == rel_id:
+                                    element.set(attr, new_rid)
+                        
+                        images_replaced += 1
+                    except Exception as alt_e:
+                        print(f"[!] Warning: Alternative method juga gagal: {str(alt_e)}")
 
         # Save the document
         doc.save(output_path)
@@ -293,14 +400,14 @@ def replace_images_in_docx(docx_path: str, original_images: List[str],
 
 
 def replace_images_in_pdf(pdf_path: str, original_images: List[str],
-                         watermarked_images: List[str], output_path: str) -> bool:
+                         watermarked_images: List[Union[str, bytes]], output_path: str) -> bool:
     """
     Replace images in a PDF document with watermarked versions.
 
     Args:
         pdf_path: Path to the original .pdf file
         original_images: List of paths to the original images
-        watermarked_images: List of paths to the watermarked images
+        watermarked_images: List of watermarked images, as file paths or PNG bytes
         output_path: Path to save the new document
 
     Returns:
@@ -324,12 +431,8 @@ def replace_images_in_pdf(pdf_path: str, original_images: List[str],
                     # Get the XREF of the image
                     xref = img[0]
                     
-                    # Read the watermarked image
-                    watermarked_path = watermarked_images[image_index]
-                    
-                    # Read watermarked image data
-                    with open(watermarked_path, "rb") as f:
-                        watermarked_data = f.read()
+                    # Read watermarked image data (no file access when given bytes)
+                    watermarked_data = _read_image_data(watermarked_images[image_index])
                     
                     # Replace the image in the PDF
                     try:
@@ -356,8 +459,9 @@ def replace_images_in_pdf(pdf_path: str, original_images: List[str],
                         
                     image_index += 1
 
-        # Save the document
-        doc.save(output_path)
+        # Save the document; garbage=4 drops the replaced image objects and merges
+        # duplicates, deflate compresses any uncompressed streams
+        doc.save(output_path, garbage=4, deflate=True, deflate_images=True)
         doc.close()
 
         if images_replaced > 0:
@@ -373,6 +477,316 @@ def replace_images_in_pdf(pdf_path: str, original_images: List[str],
         return False
 
 
+def _cheap_copy(src: str, dst: str) -> None:
+    """
+    Make dst available with the contents of src, as a hardlink when possible.
+
+    A hardlink is a new directory entry for the same file (no data copied); removing
+    the temp source later leaves dst intact. Falls back to a real copy when linking
+    is not possible (e.g. across filesystems, or dst already exists).
+    """
+    try:
+        os.link(src, dst)
+    except (OSError, NotImplementedError):
+        shutil.copy(src, dst)
+
+
+def _load_qr_array(qr_path: str) -> np.ndarray:
+    """Load a QR image once as a 2-D uint8 module mask (1 = dark)."""
+    with Image.open(qr_path) as qr_img:
+        return (np.asarray(qr_img.convert('L')) < 128).astype(np.uint8)
+
+
+def _init_pool_worker() -> None:
+    """
+    Per-process setup for pool workers, run once when each worker starts.
+
+    The pool already runs one worker per core, so OpenCV's own thread pool is limited
+    to one thread per worker instead of each worker starting a thread per core.
+    """
+    import cv2
+    cv2.setNumThreads(1)
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the module-wide process pool (one worker per CPU core), creating it on first use.
+
+    Reusing one pool across documents avoids starting worker processes for every call,
+    and state initialised inside a worker (imports, OpenCV setup) is kept between
+    calls; the pool is shut down at interpreter exit.
+
+    Workers are started with "forkserver" where available (POSIX), otherwise "spawn"
+    (as on Windows), never with a plain fork: the pool is usually first created from a
+    threaded Flask request, and a fork could copy locks (logging, other requests,
+    background cleanup threads) held by other threads into the worker and deadlock it.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                mp_context=multiprocessing.get_context(_POOL_START_METHOD),
+                                                initializer=_init_pool_worker)
+            atexit.register(_process_pool.shutdown)
+        return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next _get_process_pool call starts a fresh one."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+
+# Penanda akhir iterator tugas untuk _submit_bounded
+_NO_TASK = object()
+
+
+def _submit_bounded(executor: ProcessPoolExecutor, fn, tasks: Iterable, window: int) -> Iterator:
+    """
+    Like executor.map, but with at most window tasks in flight; results are yielded in task order.
+
+    executor.map pulls every task from the iterable up front, so a lazy task source
+    (images extracted on demand) would be drained at once. Here, once the window is
+    full, the oldest result is yielded before the next task is taken from tasks.
+    """
+    tasks = iter(tasks)
+    pending = deque()
+    while True:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        task = next(tasks, _NO_TASK)
+        if task is _NO_TASK:
+            break
+        pending.append(executor.submit(fn, task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _watermark_batch(args: Tuple[List[Tuple[int, str]], np.ndarray, str, str, str, int, bool, int]
+                     ) -> List[Optional[Tuple[str, dict, bytes]]]:
+    """
+    Watermark a batch of extracted images (worker for _watermark_images).
+
+    The batch goes through embed_qr_to_images_batch with the preloaded QR array,
+    so the QR bitstream is built once per batch and the QR file is never re-read.
+
+    Args:
+        args: ([(index, image path), ...], QR array, temp dir, public dir, public dir name,
+               total images, remove the extracted images afterwards, PNG compress level)
+
+    Returns:
+        List[Optional[Tuple[str, dict, bytes]]]: Per image (watermarked path, processed image info,
+        watermarked PNG bytes), or None if embedding failed
+    """
+    batch, qr_array, temp_dir, public_dir, public_dir_name, total, remove_source, compress_level = args
+
+    # Path prefixes are joined once; per image only the index is formatted in
+    temp_prefix = os.path.join(temp_dir, "")
+    public_prefix = os.path.join(public_dir, "")
+
+    watermarked_paths = []
+    for i, img_path in batch:
+        print(f"[*] Menyisipkan watermark QR Code ke gambar {i + 1}/{total}")
+        watermarked_paths.append(f"{temp_prefix}watermarked_{i}.png")
+
+        # Copy original to public directory for display (same format as extracted)
+        _cheap_copy(img_path, f"{public_prefix}original_{i}{os.path.splitext(img_path)[1]}")
+
+    # The PNG bytes are kept so the document replacement step does not read the files back
+    watermarked_blobs = []
+    try:
+        # Perform the watermarking
+        errors = embed_qr_to_images_batch([img_path for _, img_path in batch], None,
+                                          watermarked_paths, resize_qr_if_needed=True, qr_array=qr_array,
+                                          compress_level=compress_level, output_blobs=watermarked_blobs)
+    except Exception as e:
+        errors = [str(e)] * len(batch)
+
+    results = []
+    for (i, img_path), watermarked_path, error, watermarked_blob in zip(batch, watermarked_paths, errors,
+                                                                         watermarked_blobs or [None] * len(batch)):
+        if remove_source:
+            os.remove(img_path)
+        if error is not None:
+            print(f"[!] Gagal watermark gambar {img_path}: {error}")
+            # Continue with other images even if one fails
+            results.append(None)
+            continue
+
+        # Copy watermarked image to public directory
+        _cheap_copy(watermarked_path, f"{public_prefix}watermarked_{i}.png")
+
+        # Store info about this image pair
+        results.append((watermarked_path, {
+            "index": i,
+            "original": f"{public_dir_name}/original_{i}{os.path.splitext(img_path)[1]}",
+            "watermarked": f"{public_dir_name}/watermarked_{i}.png"
+        }, watermarked_blob))
+
+    return results
+
+
+def _watermark_images(image_paths: Iterable[str], total: int, qr_array: np.ndarray, temp_dir: str,
+                      public_dir: str, public_dir_name: str,
+                      remove_source: bool = False, compress_level: int = 6) -> Iterator[Tuple[str, dict, bytes]]:
+    """
+    Watermark extracted images in batches, one process per CPU core.
+
+    image_paths may be a lazy iterator (see iter_images_from_pdf): each batch is
+    dispatched as soon as its images are extracted, and only POOL_TASKS_PER_WORKER
+    batches per worker are in flight, so extraction stays at most that far ahead of
+    watermarking. With remove_source, each extracted image is deleted once its
+    watermarked copy is written, so only the in-flight originals are on disk at once.
+    compress_level sets the zlib level of the watermarked PNGs.
+
+    qr_array is the QR decoded once for the whole document (see _load_qr_array);
+    workers receive the array instead of reopening the QR file.
+
+    Yields (watermarked path, processed image info, watermarked PNG bytes) in image order,
+    skipping images that failed.
+    """
+    workers = min(total, os.cpu_count() or 1)
+    # Enough batches to keep every worker busy, each sharing one decoded QR
+    batch_size = max(1, min(WATERMARK_BATCH_SIZE, -(-total // workers))) if workers else 1
+
+    def _batches() -> Iterator[Tuple[List[Tuple[int, str]], np.ndarray, str, str, str, int, bool, int]]:
+        batch = []
+        for i, img_path in enumerate(image_paths):
+            batch.append((i, img_path))
+            if len(batch) == batch_size:
+                yield batch, qr_array, temp_dir, public_dir, public_dir_name, total, remove_source, compress_level
+                batch = []
+        if batch:
+            yield batch, qr_array, temp_dir, public_dir, public_dir_name, total, remove_source, compress_level
+
+    if workers <= 1:
+        # A single worker is not worth the process start-up cost
+        for results in map(_watermark_batch, _batches()):
+            yield from (result for result in results if result is not None)
+        return
+
+    executor = _get_process_pool()
+    try:
+        for results in _submit_bounded(executor, _watermark_batch, _batches(), POOL_TASKS_PER_WORKER * workers):
+            yield from (result for result in results if result is not None)
+    except BrokenProcessPool:
+        _discard_process_pool(executor)
+        raise
+
+
+def _prepare_qr(qr_path: Optional[str], qr_data: Optional[str], output_path: str,
+                document_path: str, security_config: Optional[dict]) -> Tuple[str, bool, dict]:
+    """
+    Resolve the QR image to embed, generating it from qr_data when no qr_path is given.
+
+    Args:
+        qr_path: Path to an existing QR code image (optional if qr_data provided)
+        qr_data: Text data to generate QR code from (optional if qr_path provided)
+        output_path: Output document path; a generated QR is placed next to it
+        document_path: Document the QR is bound to when security is enabled
+        security_config: Optional security configuration for QR generation
+
+    Returns:
+        Tuple[str, bool, dict]: (QR path, whether it was generated here, security info)
+    """
+    # Validate inputs
+    if not qr_path and not qr_data:
+        raise ValueError("Either qr_path or qr_data must be provided")
+
+    if not qr_data or qr_path:
+        return qr_path, False, {"security_level": "unknown"}
+
+    # Generate QR code from data
+    temp_qr_filename = f"temp_qr_{uuid.uuid4().hex}.png"
+    qr_temp_path = os.path.join(os.path.dirname(output_path), temp_qr_filename)
+
+    # Check if security is enabled
+    if security_config and security_config.get('enable_security', False):
+        if SecureQRGenerator is None:
+            raise ValueError("Secure QR generation is not available")
+
+        # Generate secure QR with document binding
+        generator = SecureQRGenerator()
+        result = generator.generate_bound_qr(
+            data=qr_data,
+            document_path=document_path,
+            output_path=qr_temp_path,
+            expiry_hours=security_config.get('expiry_hours', 24)
+        )
+
+        if not result.get('success', False):
+            raise ValueError(f"Failed to generate secure QR: {result.get('error')}")
+
+        return qr_temp_path, True, {
+            "binding_id": result.get('binding_id'),
+            "expiry_time": result.get('expiry_time'),
+            "security_level": "high"
+        }
+
+    # Generate regular QR code
+    result = generate_qr_with_analysis(qr_data, qr_temp_path)
+
+    if not result.get('success', False):
+        raise ValueError(f"Failed to generate QR: {result.get('error')}")
+
+    return qr_temp_path, True, {"security_level": "none"}
+
+
+def _setup_dirs(output_path: str) -> Tuple[str, str, str]:
+    """
+    Create the temp and public directories for one embed run, next to output_path.
+
+    Every image in the temp directory is also published to the public directory, so
+    both stay on the same filesystem and publishing is a hardlink, not a copy.
+
+    Returns:
+        Tuple[str, str, str]: (temp dir, public dir, public dir name)
+    """
+    # Create a unique temporary directory to store extracted and watermarked images
+    temp_dir_name = f"temp_embed_{uuid.uuid4().hex}"
+    temp_dir = os.path.join(os.path.dirname(output_path), temp_dir_name)
+    os.makedirs(temp_dir, exist_ok=True)
+
+    # Create a public directory to store images for viewing
+    public_dir_name = f"processed_{uuid.uuid4().hex}"
+    public_dir = os.path.join(os.path.dirname(output_path), public_dir_name)
+    os.makedirs(public_dir, exist_ok=True)
+
+    return temp_dir, public_dir, public_dir_name
+
+
+def _rmtree_quietly(path: str) -> None:
+    """Remove a directory tree, reporting (not raising) failures."""
+    try:
+        shutil.rmtree(path)
+    except Exception as e:
+        print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
+
+
+def _remove_temp_dir_async(temp_dir: str) -> None:
+    """
+    Remove temp_dir in a background thread so the caller does not wait on the deletion.
+
+    Pending removals are joined at interpreter exit (see _join_pending_cleanup).
+    """
+    if not os.path.exists(temp_dir):
+        return
+    _pending_cleanup[:] = [t for t in _pending_cleanup if t.is_alive()]
+    thread = threading.Thread(target=_rmtree_quietly, args=(temp_dir,), daemon=True)
+    thread.start()
+    _pending_cleanup.append(thread)
+
+
+@atexit.register
+def _join_pending_cleanup() -> None:
+    """Give background temp-dir removals a chance to finish before the process exits."""
+    for thread in _pending_cleanup:
+        thread.join(timeout=5)
+
+
 def embed_watermark_to_docx(docx_path: str, qr_path: str = None, output_path: str = None,
                           qr_data: str = None, security_config: dict = None,
                           progress_callback=None) -> dict:
@@ -390,72 +804,25 @@ def embed_watermark_to_docx(docx_path: str, qr_path: str = None, output_path: st
         dict: Result dictionary with success status and processed image info
     """
     try:
-        # Validate inputs
-        if not qr_path and not qr_data:
-            raise ValueError("Either qr_path or qr_data must be provided")
-        
-        # If qr_data is provided but no qr_path, generate QR code
-        qr_temp_path = qr_path
-        qr_generated = False
-        
-        if qr_data and not qr_path:
-            # Generate QR code from data
-            temp_qr_filename = f"temp_qr_{uuid.uuid4().hex}.png"
-            qr_temp_path = os.path.join(os.path.dirname(output_path), temp_qr_filename)
-            
-            # Check if security is enabled
-            if security_config and security_config.get('enable_security', False):
-                # Generate secure QR with document binding
-                from secure_qr_utils import SecureQRGenerator
-                generator = SecureQRGenerator()
-                
-                result = generator.generate_bound_qr(
-                    data=qr_data,
-                    document_path=docx_path,
-                    output_path=qr_temp_path,
-                    expiry_hours=security_config.get('expiry_hours', 24)
-                )
-                
-                if not result.get('success', False):
-                    raise ValueError(f"Failed to generate secure QR: {result.get('error')}")
-                
-                qr_generated = True
-                security_info = {
-                    "binding_id": result.get('binding_id'),
-                    "expiry_time": result.get('expiry_time'),
-                    "security_level": "high"
-                }
-            else:
-                # Generate regular QR code
-                from qr_utils import generate_qr_with_analysis
-                result = generate_qr_with_analysis(qr_data, qr_temp_path)
-                
-                if not result.get('success', False):
-                    raise ValueError(f"Failed to generate QR: {result.get('error')}")
-                
-                qr_generated = True
-                security_info = {"security_level": "none"}
-        else:
-            security_info = {"security_level": "unknown"}
-
-        # Create a unique temporary directory to store extracted and watermarked images
-        temp_dir_name = f"temp_embed_{uuid.uuid4().hex}"
-        temp_dir = os.path.join(os.path.dirname(output_path), temp_dir_name)
-        os.makedirs(temp_dir, exist_ok=True)
+        # Resolve the QR to embed (generating it from qr_data if needed)
+        qr_temp_path, qr_generated, security_info = _prepare_qr(qr_path, qr_data, output_path,
+                                                                 docx_path, security_config)
 
-        # Create a public directory to store images for viewing
-        public_dir_name = f"processed_{uuid.uuid4().hex}"
-        public_dir = os.path.join(os.path.dirname(output_path), public_dir_name)
-        os.makedirs(public_dir, exist_ok=True)
+        # Create temporary and public directories for extracted and watermarked images
+        temp_dir, public_dir, public_dir_name = _setup_dirs(output_path)
 
-        # Extract images from the document
+        # Image blobs are already in memory once the docx is parsed; each is written
+        # to the temp directory only when its batch is about to be watermarked
         print(f"[*] Mengekstrak gambar dari dokumen: {docx_path}")
-        extracted_images = extract_images_from_docx(docx_path, temp_dir)
+        doc = docx.Document(docx_path)
+        image_rels = _docx_image_rels(doc)
+        image_blobs = list(iter_image_blobs_from_docx(docx_path, image_rels))
+        total_images = len(image_blobs)
 
         if progress_callback:
-            progress_callback(0, len(extracted_images))
+            progress_callback(0, total_images)
 
-        if not extracted_images:
+        if not total_images:
             print("[!] Dokumen ini tidak mengandung gambar")
             # Clean up temporary directory
             if os.path.exists(temp_dir):
@@ -474,74 +841,43 @@ def embed_watermark_to_docx(docx_path: str, qr_path: str = None, output_path: st
         # Prepare to store info about processed images
         processed_images = []
 
-        # Watermark each image
-        watermarked_images = []
-        for i, img_path in enumerate(extracted_images):
-            print(f"[*] Menyisipkan watermark QR Code ke gambar {i + 1}/{len(extracted_images)}")
-            watermarked_path = os.path.join(temp_dir, f"watermarked_{i}.png")
-            
-            # Create public copies for display
-            original_public_name = f"original_{i}.png"
-            watermarked_public_name = f"watermarked_{i}.png"
-            original_public_path = os.path.join(public_dir, original_public_name)
-            watermarked_public_path = os.path.join(public_dir, watermarked_public_name)
-            
-            # Copy original to public directory
-            shutil.copy(img_path, original_public_path)
-            
-            try:
-                # Perform the watermarking
-                embed_qr_to_image(img_path, qr_temp_path, watermarked_path, resize_qr_if_needed=True)
-                watermarked_images.append(watermarked_path)
-                
-                # Copy watermarked image to public directory
-                shutil.copy(watermarked_path, watermarked_public_path)
-                
-                # Store info about this image pair
-                processed_images.append({
-                    "index": i,
-                    "original": f"{public_dir_name}/{original_public_name}",
-                    "watermarked": f"{public_dir_name}/{watermarked_public_name}"
-                })
-
-                if progress_callback:
-                    progress_callback(i + 1, len(extracted_images))
-                
-            except Exception as e:
-                print(f"[!] Gagal watermark gambar {img_path}: {str(e)}")
-                # Continue with other images even if one fails
+        # Decode the QR once for the whole document; it is shared by every watermark batch
+        qr_array = _load_qr_array(qr_temp_path)
+
+        # Write and watermark in one pass (images are independent, so they run in parallel
+        # processes); each written image is removed once watermarked
+        original_images = []
+        watermarked_blobs = []
+        extracted = _write_image_blobs(image_blobs, temp_dir)
+        for _, image_info, watermarked_blob in _watermark_images(extracted, total_images, qr_array, temp_dir,
+                                                                 public_dir, public_dir_name, remove_source=True):
+            original_images.append(image_blobs[image_info["index"]][0])
+            watermarked_blobs.append(watermarked_blob)
+            processed_images.append(image_info)
+
+            if progress_callback:
+                progress_callback(image_info["index"] + 1, total_images)
+        del image_blobs
 
         # Replace images in the document with watermarked versions
         print(f"[*] Mengganti gambar dalam dokumen dengan versi watermark")
-        success = replace_images_in_docx(docx_path, extracted_images, watermarked_images, output_path)
+        success = replace_images_in_docx(docx_path, original_images, watermarked_blobs, output_path,
+                                         doc=doc, image_rels=image_rels)
 
-        # Clean up temporary files
-        for path in extracted_images + watermarked_images:
-            if os.path.exists(path) and not os.path.basename(path).startswith("original_") and not os.path.basename(path).startswith("watermarked_"):
-                os.remove(path)
-
-        if os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
+        # Temp files are deleted in the background; the result does not depend on them
+        _remove_temp_dir_async(temp_dir)
 
         # Copy QR code to public directory for display
         qr_public_name = "watermark_qr.png"
         qr_public_path = os.path.join(public_dir, qr_public_name)
-        shutil.copy(qr_temp_path, qr_public_path)
+        _cheap_copy(qr_temp_path, qr_public_path)
 
-        # Get QR code dimensions
-        try:
-            qr_img = Image.open(qr_temp_path)
-            qr_width, qr_height = qr_img.size
-            qr_info = {
-                "width": qr_width,
-                "height": qr_height
-            }
-        except Exception as e:
-            print(f"[!] Warning: Couldn't get QR dimensions: {str(e)}")
-            qr_info = {"width": 21, "height": 21}  # Default QR size
+        # Get QR code dimensions from the already decoded QR
+        qr_height, qr_width = qr_array.shape
+        qr_info = {
+            "width": qr_width,
+            "height": qr_height
+        }
 
         # Clean up generated QR if it was temporary
         if qr_generated and qr_temp_path != qr_path and os.path.exists(qr_temp_path):
@@ -552,7 +888,7 @@ def embed_watermark_to_docx(docx_path: str, qr_path: str = None, output_path: st
         result = {
             "success": success,
             "processed_images": processed_images,
-            "total_images": len(extracted_images),
+            "total_images": total_images,
             "qr_image": f"{public_dir_name}/{qr_public_name}",
             "public_dir": public_dir_name,
             "qr_info": qr_info,
@@ -597,74 +933,26 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str = None, output_path: str
         security_config: Optional security configuration for QR generation
 
     Returns:
-        dict: Result dictionary with success status and processed image info
+        dict: Result dictionary with success status and processed image info. Each
+        processed_images[*]["original"] keeps the extracted image's extension: ".jpg"
+        for JPEG images passed through unchanged, otherwise ".png"
     """
     try:
-        # Validate inputs
-        if not qr_path and not qr_data:
-            raise ValueError("Either qr_path or qr_data must be provided")
-        
-        # If qr_data is provided but no qr_path, generate QR code
-        qr_temp_path = qr_path
-        qr_generated = False
-        
-        if qr_data and not qr_path:
-            # Generate QR code from data
-            temp_qr_filename = f"temp_qr_{uuid.uuid4().hex}.png"
-            qr_temp_path = os.path.join(os.path.dirname(output_path), temp_qr_filename)
-            
-            # Check if security is enabled
-            if security_config and security_config.get('enable_security', False):
-                # Generate secure QR with document binding
-                from secure_qr_utils import SecureQRGenerator
-                generator = SecureQRGenerator()
-                
-                result = generator.generate_bound_qr(
-                    data=qr_data,
-                    document_path=pdf_path,
-                    output_path=qr_temp_path,
-                    expiry_hours=security_config.get('expiry_hours', 24)
-                )
-                
-                if not result.get('success', False):
-                    raise ValueError(f"Failed to generate secure QR: {result.get('error')}")
-                
-                qr_generated = True
-                security_info = {
-                    "binding_id": result.get('binding_id'),
-                    "expiry_time": result.get('expiry_time'),
-                    "security_level": "high"
-                }
-            else:
-                # Generate regular QR code
-                from qr_utils import generate_qr_with_analysis
-                result = generate_qr_with_analysis(qr_data, qr_temp_path)
-                
-                if not result.get('success', False):
-                    raise ValueError(f"Failed to generate QR: {result.get('error')}")
-                
-                qr_generated = True
-                security_info = {"security_level": "none"}
-        else:
-            security_info = {"security_level": "unknown"}
-        # Create a unique temporary directory to store extracted and watermarked images
-        temp_dir_name = f"temp_embed_{uuid.uuid4().hex}"
-        temp_dir = os.path.join(os.path.dirname(output_path), temp_dir_name)
-        os.makedirs(temp_dir, exist_ok=True)
-
-        # Create a public directory to store images for viewing
-        public_dir_name = f"processed_{uuid.uuid4().hex}"
-        public_dir = os.path.join(os.path.dirname(output_path), public_dir_name)
-        os.makedirs(public_dir, exist_ok=True)
-
-        # Extract images from the document
+        # Resolve the QR to embed (generating it from qr_data if needed)
+        qr_temp_path, qr_generated, security_info = _prepare_qr(qr_path, qr_data, output_path,
+                                                                 pdf_path, security_config)
+
+        # Create temporary and public directories for extracted and watermarked images
+        temp_dir, public_dir, public_dir_name = _setup_dirs(output_path)
+
+        # Images are extracted lazily below; only count them up front
         print(f"[*] Mengekstrak gambar dari PDF: {pdf_path}")
-        extracted_images = extract_images_from_pdf(pdf_path, temp_dir)
+        total_images = count_images_in_pdf(pdf_path)
 
         if progress_callback:
-            progress_callback(0, len(extracted_images))
+            progress_callback(0, total_images)
 
-        if not extracted_images:
+        if not total_images:
             print("[!] PDF ini tidak mengandung gambar")
             # Clean up temporary directory
             if os.path.exists(temp_dir):
@@ -678,74 +966,42 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str = None, output_path: str
         # Prepare to store info about processed images
         processed_images = []
 
-        # Watermark each image
-        watermarked_images = []
-        for i, img_path in enumerate(extracted_images):
-            print(f"[*] Menyisipkan watermark QR Code ke gambar {i + 1}/{len(extracted_images)}")
-            watermarked_path = os.path.join(temp_dir, f"watermarked_{i}.png")
-            
-            # Create public copies for display
-            original_public_name = f"original_{i}.png"
-            watermarked_public_name = f"watermarked_{i}.png"
-            original_public_path = os.path.join(public_dir, original_public_name)
-            watermarked_public_path = os.path.join(public_dir, watermarked_public_name)
-            
-            # Copy original to public directory
-            shutil.copy(img_path, original_public_path)
-            
-            try:
-                # Perform the watermarking
-                embed_qr_to_image(img_path, qr_temp_path, watermarked_path, resize_qr_if_needed=True)
-                watermarked_images.append(watermarked_path)
-                
-                # Copy watermarked image to public directory
-                shutil.copy(watermarked_path, watermarked_public_path)
-                
-                # Store info about this image pair
-                processed_images.append({
-                    "index": i,
-                    "original": f"{public_dir_name}/{original_public_name}",
-                    "watermarked": f"{public_dir_name}/{watermarked_public_name}"
-                })
-
-                if progress_callback:
-                    progress_callback(i + 1, len(extracted_images))
-                
-            except Exception as e:
-                print(f"[!] Gagal watermark gambar {img_path}: {str(e)}")
-                # Continue with other images even if one fails
+        # Decode the QR once for the whole document; it is shared by every watermark batch
+        qr_array = _load_qr_array(qr_temp_path)
+
+        # Extract and watermark in one pass; each extracted image is removed once watermarked,
+        # so only the watermarked copies accumulate in the temp directory. MuPDF re-encodes
+        # the watermarked PNGs when inserting them, so they are written with fast zlib level 1.
+        watermarked_blobs = []
+        extracted = iter_images_from_pdf(pdf_path, temp_dir)
+        for _, image_info, watermarked_blob in _watermark_images(extracted, total_images, qr_array, temp_dir,
+                                                                 public_dir, public_dir_name, remove_source=True,
+                                                                 compress_level=1):
+            watermarked_blobs.append(watermarked_blob)
+            processed_images.append(image_info)
+
+            if progress_callback:
+                progress_callback(image_info["index"] + 1, total_images)
 
         # Replace images in the document with watermarked versions
         print(f"[*] Mengganti gambar dalam PDF dengan versi watermark")
-        success = replace_images_in_pdf(pdf_path, extracted_images, watermarked_images, output_path)
+        # (extracted originals are already removed; replacement only needs the watermarked bytes)
+        success = replace_images_in_pdf(pdf_path, [], watermarked_blobs, output_path)
 
-        # Clean up temporary files
-        for path in extracted_images + watermarked_images:
-            if os.path.exists(path) and not os.path.basename(path).startswith("original_") and not os.path.basename(path).startswith("watermarked_"):
-                os.remove(path)
-
-        if os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
+        # Temp files are deleted in the background; the result does not depend on them
+        _remove_temp_dir_async(temp_dir)
 
         # Copy QR code to public directory for display
         qr_public_name = "watermark_qr.png"
         qr_public_path = os.path.join(public_dir, qr_public_name)
-        shutil.copy(qr_temp_path, qr_public_path)
+        _cheap_copy(qr_temp_path, qr_public_path)
 
-        # Get QR code dimensions
-        try:
-            qr_img = Image.open(qr_temp_path)
-            qr_width, qr_height = qr_img.size
-            qr_info = {
-                "width": qr_width,
-                "height": qr_height
-            }
-        except Exception as e:
-            print(f"[!] Warning: Couldn't get QR dimensions: {str(e)}")
-            qr_info = {"width": 21, "height": 21}  # Default QR size
+        # Get QR code dimensions from the already decoded QR
+        qr_height, qr_width = qr_array.shape
+        qr_info = {
+            "width": qr_width,
+            "height": qr_height
+        }
 
         # Clean up generated QR if it was temporary
         if qr_generated and qr_temp_path != qr_path and os.path.exists(qr_temp_path):
@@ -756,7 +1012,7 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str = None, output_path: str
         result = {
             "success": success,
             "processed_images": processed_images,
-            "total_images": len(extracted_images),
+            "total_images": total_images,
             "qr_image": f"{public_dir_name}/{qr_public_name}",
             "public_dir": public_dir_name,
             "qr_info": qr_info,
@@ -787,6 +1043,70 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str = None, output_path: str
         return {"success": False, "error": str(e)}
 
 
+def _extract_qr_task(args: Tuple[int, str, bytes, str, int]) -> bool:
+    """
+    Extract and read the QR hidden in one image (worker for _extract_qr_codes).
+
+    Args:
+        args: (image index, image file name, image bytes, output path for the QR, total images)
+
+    Returns:
+        bool: True if a QR was extracted (even if it could not be read)
+    """
+    i, image_name, image_data, qr_output_path, total = args
+    print(f"[*] Mencoba ekstraksi QR Code dari gambar {i + 1}/{total}")
+
+    try:
+        qr_pixels = extract_qr_from_image(BytesIO(image_data), qr_output_path)
+    except Exception as e:
+        print(f"[!] Gagal ekstraksi QR dari gambar {image_name}: {str(e)}")
+        return False
+
+    # Try to read the QR to verify it's valid, decoding the pixels we already
+    # hold instead of reloading the PNG that was just written
+    try:
+        qr_data = read_qr_from_array(qr_pixels, qr_output_path)
+        if qr_data:
+            print(f"[*] QR Code berhasil diekstrak dan dibaca: {qr_data}")
+        else:
+            print(f"[!] QR Code diekstrak tetapi tidak berisi data yang valid")
+    except Exception as qr_read_error:
+        print(f"[!] QR Code diekstrak tetapi tidak dapat dibaca: {str(qr_read_error)}")
+    return True
+
+
+def _extract_qr_codes(image_blobs: Iterable[Tuple[str, bytes]], total: int, qr_output_prefix: str) -> bool:
+    """
+    Extract the QR from every image, one process per CPU core.
+
+    Images are handed over in memory (see iter_image_blobs_from_pdf), never written to
+    disk; with a pool they travel to the workers through its pipe. image_blobs may be a
+    lazy iterator: each image is submitted as soon as it is extracted, so extraction of
+    the next image overlaps with QR decoding in the workers. Only POOL_TASKS_PER_WORKER
+    images per worker are in flight (see _submit_bounded), so a lazy source holds a
+    few images in memory at a time rather than the whole document. Images are
+    independent; a failure on one image does not stop the others. The QR of image i
+    is written to "<qr_output_prefix><i>.png".
+
+    Returns:
+        bool: True if a QR was extracted from any image
+    """
+    tasks = ((i, image_name, image_data, f"{qr_output_prefix}{i}.png", total)
+             for i, (image_name, image_data) in enumerate(image_blobs))
+
+    workers = min(total, os.cpu_count() or 1)
+    if workers <= 1:
+        # A single worker is not worth the process start-up cost
+        return any([_extract_qr_task(task) for task in tasks])
+
+    executor = _get_process_pool()
+    try:
+        return any(list(_submit_bounded(executor, _extract_qr_task, tasks, POOL_TASKS_PER_WORKER * workers)))
+    except BrokenProcessPool:
+        _discard_process_pool(executor)
+        raise
+
+
 def extract_watermark_from_docx(docx_path: str, output_dir: str) -> bool:
     """
     Extract QR watermarks from images in a docx document.
@@ -802,62 +1122,23 @@ def extract_watermark_from_docx(docx_path: str, output_dir: str) -> bool:
         # Make sure the output directory exists
         os.makedirs(output_dir, exist_ok=True)
 
-        # Create a unique temporary directory to store extracted images
-        temp_dir_name = f"temp_extract_{uuid.uuid4().hex}"
-        temp_dir = os.path.join(output_dir, temp_dir_name)
-        os.makedirs(temp_dir, exist_ok=True)
-
-        # Extract images from the document
+        # Extract images from the document, kept in memory (no temporary files)
         print(f"[*] Mengekstrak gambar dari dokumen: {docx_path}")
-        extracted_images = extract_images_from_docx(docx_path, temp_dir)
+        try:
+            image_blobs = list(iter_image_blobs_from_docx(docx_path))
+        except Exception as e:
+            print(f"[!] Error saat mengekstrak gambar dari dokumen: {str(e)}")
+            image_blobs = []
 
-        if not extracted_images:
+        if not image_blobs:
+            print("[!] Tidak ada gambar yang ditemukan dalam dokumen")
             print("[!] Dokumen ini tidak mengandung gambar")
-            # Clean up temporary directory
-            if os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
             # Raise specific error for no images
             raise ValueError("NO_IMAGES_FOUND")
+        print(f"[*] Berhasil mengekstrak {len(image_blobs)} gambar dari dokumen")
 
-        # Try to extract QR codes from each image
-        qr_found = False
-        for i, img_path in enumerate(extracted_images):
-            print(f"[*] Mencoba ekstraksi QR Code dari gambar {i + 1}/{len(extracted_images)}")
-            qr_output_path = os.path.join(output_dir, f"extracted_qr_{i}.png")
-
-            try:
-                extract_qr_from_image(img_path, qr_output_path)
-                qr_found = True
-
-                # Try to read the QR to verify it's valid
-                try:
-                    qr_data = read_qr(qr_output_path)
-                    if qr_data:
-                        print(f"[*] QR Code berhasil diekstrak dan dibaca: {qr_data}")
-                    else:
-                        print(f"[!] QR Code diekstrak tetapi tidak berisi data yang valid")
-                except Exception as qr_read_error:
-                    print(f"[!] QR Code diekstrak tetapi tidak dapat dibaca: {str(qr_read_error)}")
-
-            except Exception as e:
-                print(f"[!] Gagal ekstraksi QR dari gambar {img_path}: {str(e)}")
-                # Continue with other images even if one fails
-
-        # Clean up temporary files
-        for path in extracted_images:
-            if os.path.exists(path):
-                os.remove(path)
-
-        if os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
-
-        return qr_found
+        # Try to extract QR codes from each image (in parallel, see _extract_qr_codes)
+        return _extract_qr_codes(image_blobs, len(image_blobs), os.path.join(output_dir, "extracted_qr_"))
     except ValueError as ve:
         if str(ve) == "NO_IMAGES_FOUND":
             # Propagate the specific error
@@ -884,62 +1165,19 @@ def extract_watermark_from_pdf(pdf_path: str, output_dir: str) -> bool:
         # Make sure the output directory exists
         os.makedirs(output_dir, exist_ok=True)
 
-        # Create a unique temporary directory to store extracted images
-        temp_dir_name = f"temp_extract_{uuid.uuid4().hex}"
-        temp_dir = os.path.join(output_dir, temp_dir_name)
-        os.makedirs(temp_dir, exist_ok=True)
-
-        # Extract images from the document
+        # Images are extracted lazily in memory below, while earlier ones are being
+        # decoded; only count them up front
         print(f"[*] Mengekstrak gambar dari PDF: {pdf_path}")
-        extracted_images = extract_images_from_pdf(pdf_path, temp_dir)
+        total_images = count_images_in_pdf(pdf_path)
 
-        if not extracted_images:
+        if not total_images:
             print("[!] PDF ini tidak mengandung gambar")
-            # Clean up temporary directory
-            if os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
             # Raise specific error for no images
             raise ValueError("NO_IMAGES_FOUND")
 
-        # Try to extract QR codes from each image
-        qr_found = False
-        for i, img_path in enumerate(extracted_images):
-            print(f"[*] Mencoba ekstraksi QR Code dari gambar {i + 1}/{len(extracted_images)}")
-            qr_output_path = os.path.join(output_dir, f"extracted_qr_{i}.png")
-
-            try:
-                extract_qr_from_image(img_path, qr_output_path)
-                qr_found = True
-
-                # Try to read the QR to verify it's valid
-                try:
-                    qr_data = read_qr(qr_output_path)
-                    if qr_data:
-                        print(f"[*] QR Code berhasil diekstrak dan dibaca: {qr_data}")
-                    else:
-                        print(f"[!] QR Code diekstrak tetapi tidak berisi data yang valid")
-                except Exception as qr_read_error:
-                    print(f"[!] QR Code diekstrak tetapi tidak dapat dibaca: {str(qr_read_error)}")
-
-            except Exception as e:
-                print(f"[!] Gagal ekstraksi QR dari gambar {img_path}: {str(e)}")
-                # Continue with other images even if one fails
-
-        # Clean up temporary files
-        for path in extracted_images:
-            if os.path.exists(path):
-                os.remove(path)
-
-        if os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
-
-        return qr_found
+        # Try to extract QR codes from each image (in parallel, see _extract_qr_codes)
+        return _extract_qr_codes(iter_image_blobs_from_pdf(pdf_path), total_images,
+                                 os.path.join(output_dir, "extracted_qr_"))
     except ValueError as ve:
         if str(ve) == "NO_IMAGES_FOUND":
             # Propagate the specific error
@@ -6,21 +6,109 @@ and maintain backward compatibility during the transition period.
 """
 
 import os
+import re
 import json
 import uuid
 import shutil
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 # Import security modules
 from document_security import DocumentBinder, BindingStorage, is_valid_uuid, format_uuid
 
+# orjson is optional: it only speeds up parsing, results are the same as json.loads
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# pybase64 is optional too: SIMD-accelerated, with the same output as the base64 module
+try:
+    from pybase64 import b64decode as _b64decode, b64encode as _b64encode
+except ImportError:
+    from base64 import b64decode as _b64decode, b64encode as _b64encode
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of record files read (or migrated) concurrently
+RECORD_READ_WORKERS = 16
+
+
+# Bytes read from the start of a record when only its fingerprint version is needed
+RECORD_HEAD_SIZE = 4096
+
+# Records written by BindingStorage start with the fingerprint, whose first key is the version
+_RECORD_VERSION_HEAD = re.compile(rb'\A\s*\{\s*"document_fingerprint"\s*:\s*\{\s*"version"\s*:\s*"([^"\\]*)"')
+
+
+# Lookup table over byte values: True for the lowercase hex digits of legacy hash IDs
+_HEX_LUT = np.zeros(256, dtype=bool)
+_HEX_LUT[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = True
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hard-link src to dst (no data copied), copying when linking is not possible"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _record_id_part(record_file: Path) -> str:
+    """Return the ID part of a record file name (without the "prereg_" prefix)"""
+    filename_stem = record_file.stem
+    if filename_stem.startswith("prereg_"):
+        # Pre-registration record
+        return filename_stem[7:]  # Remove "prereg_" prefix
+    return filename_stem
+
+
+def _hash_id_mask(id_parts: List[str]) -> np.ndarray:
+    """
+    Classify all IDs at once: True where the ID is 16 lowercase hex characters
+    (the legacy hash-based ID format)
+    """
+    mask = np.zeros(len(id_parts), dtype=bool)
+    candidates = [i for i, id_part in enumerate(id_parts) if len(id_part) == 16 and id_part.isascii()]
+    if candidates:
+        chars = np.frombuffer(''.join(id_parts[i] for i in candidates).encode('ascii'),
+                              dtype=np.uint8).reshape(-1, 16)
+        mask[candidates] = _HEX_LUT[chars].all(axis=1)
+    return mask
+
+
+def _load_record(record_file: Path) -> Any:
+    """Load one JSON record; the exception is returned instead of raised"""
+    try:
+        return _json_loads(record_file.read_bytes())
+    except Exception as e:
+        return e
+
+
+def _load_record_version(record_file: Path) -> Any:
+    """
+    Load only the fingerprint version of a record; the exception is returned instead of raised
+    
+    The version is taken from the first RECORD_HEAD_SIZE bytes when the record starts
+    with the layout BindingStorage writes; any other layout is parsed in full
+    """
+    try:
+        with open(record_file, 'rb') as f:
+            head = f.read(RECORD_HEAD_SIZE)
+            match = _RECORD_VERSION_HEAD.match(head)
+            if match:
+                return match.group(1).decode('utf-8')
+            record = _json_loads(head + f.read())
+        return record.get("document_fingerprint", {}).get("version", "1.0")
+    except Exception as e:
+        return e
+
 
 class MigrationManager:
     """Manager for handling migration from hash-based to UUID-based storage"""
@@ -54,7 +142,9 @@ class MigrationManager:
             timestamped_backup_dir = self.backup_dir / f"backup_{backup_timestamp}"
             
             if self.storage_dir.exists():
-                shutil.copytree(self.storage_dir, timestamped_backup_dir)
+                # Hard-link snapshot: record files are only ever replaced (new file + rename or
+                # unlink), never rewritten in place, so the linked backup keeps the old contents
+                shutil.copytree(self.storage_dir, timestamped_backup_dir, copy_function=_link_or_copy)
                 logger.info(f"Backup created successfully: {timestamped_backup_dir}")
                 return True
             else:
@@ -65,10 +155,33 @@ class MigrationManager:
             logger.error(f"Error creating backup: {e}")
             return False
     
-    def analyze_existing_records(self) -> Dict[str, Any]:
+    def _iter_records(self, loader=_load_record):
+        """
+        Yield (record_file, loader(record_file)) for every JSON file in the storage directory
+        
+        The files are read concurrently so the per-file open/read latency overlaps;
+        records are yielded in directory order. If a file cannot be read or parsed,
+        the loader returns the exception raised while loading it.
+        """
+        # One scandir pass; DirEntry carries the name and file type from the directory read
+        with os.scandir(self.storage_dir) as entries:
+            record_files = [Path(entry.path) for entry in entries
+                            if os.path.normcase(entry.name).endswith(".json")
+                            and entry.is_file()]
+        if not record_files:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(RECORD_READ_WORKERS, len(record_files))) as executor:
+            yield from zip(record_files, executor.map(loader, record_files))
+    
+    def analyze_existing_records(self, migrate_callback: Optional[Callable[[Path], Any]] = None) -> Dict[str, Any]:
         """
         Analyze existing binding records to understand migration requirements
         
+        Args:
+            migrate_callback: Called with the path of each file that needs migration,
+                in the order of "files_to_migrate", as soon as it is found
+        
         Returns:
             Dict with analysis results
         """
@@ -88,32 +201,28 @@ class MigrationManager:
                 logger.info("Storage directory does not exist - no migration needed")
                 return analysis
             
-            for record_file in self.storage_dir.glob("*.json"):
+            # Only the fingerprint version is needed here, not the whole record
+            records = list(self._iter_records(_load_record_version))
+            id_parts = [_record_id_part(record_file) for record_file, _ in records]
+            is_hash_id = _hash_id_mask(id_parts)
+            
+            for (record_file, version), id_part, hash_id in zip(records, id_parts, is_hash_id):
                 analysis["total_files"] += 1
                 
                 try:
-                    with open(record_file, 'r') as f:
-                        record = json.load(f)
+                    if isinstance(version, Exception):
+                        raise version
                     
                     # Check record version
-                    version = record.get("document_fingerprint", {}).get("version", "1.0")
                     if version == "2.0":
                         analysis["version_2_records"] += 1
                     else:
                         analysis["version_1_records"] += 1
                     
                     # Check filename pattern
-                    filename_stem = record_file.stem
-                    
-                    if filename_stem.startswith("prereg_"):
-                        # Pre-registration record
-                        id_part = filename_stem[7:]  # Remove "prereg_" prefix
-                    else:
-                        id_part = filename_stem
-                    
                     if is_valid_uuid(id_part):
                         analysis["uuid_based_files"] += 1
-                    elif len(id_part) == 16 and all(c in '0123456789abcdef' for c in id_part):
+                    elif hash_id:
                         # Looks like hash-based ID
                         analysis["hash_based_files"] += 1
                         analysis["files_to_migrate"].append({
@@ -121,6 +230,8 @@ class MigrationManager:
                             "current_id": id_part,
                             "version": version
                         })
+                        if migrate_callback is not None:
+                            migrate_callback(record_file)
                     else:
                         analysis["invalid_files"] += 1
                         logger.warning(f"Unrecognized file pattern: {record_file}")
@@ -152,8 +263,7 @@ class MigrationManager:
         """
         try:
             # Load existing record
-            with open(record_file, 'r') as f:
-                record = json.load(f)
+            record = _json_loads(record_file.read_bytes())
             
             # Check if already migrated
             fingerprint = record.get("document_fingerprint", {})
@@ -184,13 +294,20 @@ class MigrationManager:
             
             new_file_path = record_file.parent / new_filename
             
-            # Save migrated record
-            with open(new_file_path, 'w') as f:
-                json.dump(record, f, indent=2)
+            # Save migrated record: written to a temp file, then renamed into place in one
+            # atomic step, so the new file is never seen half-written
+            temp_file = new_file_path.with_name(f"{new_filename}.tmp")
+            try:
+                with open(temp_file, 'w') as f:
+                    json.dump(record, f, indent=2)
+                os.replace(temp_file, new_file_path)
+            finally:
+                if temp_file.exists():
+                    temp_file.unlink()
             
             # Remove old file if different
             if new_file_path != record_file:
-                record_file.unlink()
+                record_file.unlink(missing_ok=True)
             
             logger.info(f"Migrated {record_file.name} -> {new_filename}")
             return True, f"Migrated to {new_filename}"
@@ -210,18 +327,16 @@ class MigrationManager:
         Returns:
             Updated binding token
         """
-        import base64
         import hmac
         import hashlib
         
         try:
             # Decode token
-            token_json = base64.b64decode(old_token.encode('ascii')).decode('utf-8')
-            token_data = json.loads(token_json)
+            token_data = _json_loads(_b64decode(old_token.encode('ascii')))
             
             # Decode payload
-            payload_bytes = base64.b64decode(token_data["payload"].encode('ascii'))
-            payload = json.loads(payload_bytes.decode('utf-8'))
+            payload_bytes = _b64decode(token_data["payload"].encode('ascii'))
+            payload = _json_loads(payload_bytes)
             
             # Update payload with new UUID
             payload["document_id"] = new_document_id
@@ -235,12 +350,12 @@ class MigrationManager:
             # This is a limitation - tokens will need to be regenerated for full security
             
             # Update token data
-            token_data["payload"] = base64.b64encode(updated_payload_bytes).decode('ascii')
+            token_data["payload"] = _b64encode(updated_payload_bytes).decode('ascii')
             token_data["version"] = "2.0"
             
             # Re-encode complete token
             updated_token_json = json.dumps(token_data)
-            updated_token = base64.b64encode(updated_token_json.encode('utf-8')).decode('ascii')
+            updated_token = _b64encode(updated_token_json.encode('utf-8')).decode('ascii')
             
             logger.warning("Updated binding token payload but signature remains unchanged - "
                           "recommend regenerating token for full security")
@@ -275,8 +390,33 @@ class MigrationManager:
         try:
             logger.info(f"Starting migration (dry_run={dry_run})")
             
-            # Analyze existing records
-            analysis = self.analyze_existing_records()
+            if dry_run:
+                # Analyze existing records
+                analysis = self.analyze_existing_records()
+                outcomes = [None] * len(analysis["files_to_migrate"])
+            else:
+                # Analysis and migration share one pass over the storage directory: each file
+                # that needs migration is submitted as soon as the analysis finds it. Each
+                # migration is an independent read-modify-write of its own file, so they run
+                # concurrently; outcomes are collected in order and tallied below
+                pending = []
+                backup_failed = False
+                
+                def migrate_when_found(record_file: Path) -> None:
+                    nonlocal backup_failed
+                    # The backup is taken once, before the first file is touched
+                    if not results["backup_created"] and not backup_failed:
+                        if self.create_backup():
+                            results["backup_created"] = True
+                        else:
+                            backup_failed = True
+                    if results["backup_created"]:
+                        pending.append(executor.submit(self.migrate_record, record_file))
+                
+                with ThreadPoolExecutor(max_workers=RECORD_READ_WORKERS) as executor:
+                    analysis = self.analyze_existing_records(migrate_callback=migrate_when_found)
+                    outcomes = [future.result() for future in pending]
+            
             results["files_analyzed"] = analysis["total_files"]
             
             if not analysis["migration_required"]:
@@ -284,17 +424,15 @@ class MigrationManager:
                 results["success"] = True
                 return results
             
-            # Create backup if not dry run
-            if not dry_run:
-                if not self.create_backup():
-                    results["errors"].append("Failed to create backup")
-                    return results
-                results["backup_created"] = True
+            if not dry_run and not results["backup_created"]:
+                results["errors"].append("Failed to create backup")
+                return results
             
-            # Migrate each file that needs migration
-            for file_info in analysis["files_to_migrate"]:
-                record_file = Path(file_info["file"])
-                
+            files_to_migrate = analysis["files_to_migrate"]
+            record_files = [Path(file_info["file"]) for file_info in files_to_migrate]
+            
+            # Record the result for each file that needs migration
+            for file_info, record_file, outcome in zip(files_to_migrate, record_files, outcomes):
                 if dry_run:
                     # Just log what would be done
                     logger.info(f"Would migrate: {record_file.name}")
@@ -305,8 +443,7 @@ class MigrationManager:
                     })
                     results["files_migrated"] += 1
                 else:
-                    # Actually migrate
-                    success, message = self.migrate_record(record_file)
+                    success, message = outcome
                     
                     if success:
                         results["files_migrated"] += 1
@@ -359,21 +496,15 @@ class MigrationManager:
                 validation["success"] = True  # No files to validate
                 return validation
             
-            for record_file in self.storage_dir.glob("*.json"):
+            for record_file, record in self._iter_records():
                 validation["total_files"] += 1
                 
                 try:
-                    with open(record_file, 'r') as f:
-                        record = json.load(f)
+                    if isinstance(record, Exception):
+                        raise record
                     
                     # Check filename has valid UUID
-                    filename_stem = record_file.stem
-                    if filename_stem.startswith("prereg_"):
-                        uuid_part = filename_stem[7:]
-                    else:
-                        uuid_part = filename_stem
-                    
-                    if is_valid_uuid(uuid_part):
+                    if is_valid_uuid(_record_id_part(record_file)):
                         validation["valid_uuid_files"] += 1
                     else:
                         validation["issues"].append(f"Invalid UUID in filename: {record_file.name}")
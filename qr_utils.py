@@ -6,9 +6,24 @@ import cv2
 from PIL import Image
 import os
 import math
+import threading
+import pickle
+from collections import OrderedDict
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+import numpy as np
 from typing import Dict, Tuple, List, Optional, Union
 import logging
 
+# pyzbar (ZBar) bersifat opsional: dekoder scan-line yang jauh lebih ringan daripada detector
+# OpenCV; jika tidak terpasang (atau library zbar tidak ditemukan) hanya OpenCV yang dipakai
+try:
+    from pyzbar.pyzbar import decode as _zbar_decode, ZBarSymbol
+except ImportError:
+    _zbar_decode = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,6 +68,123 @@ QR_CAPACITY_BYTE = {
     10: {'L': 271, 'M': 213, 'Q': 151, 'H': 119}
 }
 
+# Tabel kapasitas yang sama dalam bentuk array (versi 1-10 x level L, M, Q, H); tiap kolom
+# naik seiring versi, sehingga versi minimum dicari dengan binary search (np.searchsorted)
+_EC_INDEX = {'L': 0, 'M': 1, 'Q': 2, 'H': 3}
+
+# Konversi level error correction ke konstanta qrcode, dan persentase data yang dapat dipulihkan
+_QRCODE_ERROR_LEVELS = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H
+}
+_EC_RECOVERY_PERCENT = {'L': 7, 'M': 15, 'Q': 25, 'H': 30}
+_EC_COLUMNS = np.arange(len(_EC_INDEX))
+_CAPACITY_ARRAYS = {
+    mode: np.array([[table[version][ec] for ec in _EC_INDEX] for version in range(1, 11)], dtype=np.int32)
+    for mode, table in (("numeric", QR_CAPACITY_NUMERIC),
+                        ("alphanumeric", QR_CAPACITY_ALPHANUMERIC),
+                        ("byte", QR_CAPACITY_BYTE))
+}
+
+# Jumlah modul per sisi untuk versi QR 0-40 (rumus QR: 17 + 4 * versi), dan perkiraan jumlah
+# piksel citranya dengan box_size 10px + border
+_MODULE_COUNT = tuple(17 + 4 * version for version in range(41))
+_ESTIMATED_PIXELS = tuple((module_count * 10 + 8) ** 2 for module_count in _MODULE_COUNT)
+
+# Tabel ambang (terurut naik) untuk klasifikasi bertingkat; nilai <= ambang ke-i memakai
+# entri ke-i (bisect_left), entri terakhir berlaku untuk nilai di atas semua ambang
+_SAFE_RATIO_THRESHOLDS = (0.01, 0.05, 0.15)
+_SAFE_RATIO_LEVELS = (("Excellent", 95), ("Good", 80), ("Fair", 60), ("Poor", 30))
+
+_EMBEDDING_RATIO_THRESHOLDS = (0.01, 0.05, 0.15)
+_QUALITY_IMPACT_LEVELS = (
+    ("Minimal", "Tidak terlihat dengan mata biasa", ">40 dB"),
+    ("Low", "Sedikit perubahan pada analisis detail", "35-40 dB"),
+    ("Moderate", "Perubahan mungkin terlihat pada pemeriksaan teliti", "25-35 dB"),
+    ("High", "Perubahan cukup terlihat", "<25 dB"),
+)
+
+_DATA_LENGTH_THRESHOLDS = (50, 100, 200)
+_DATA_LENGTH_SCORES = (
+    (90, None),
+    (75, None),
+    (60, "Data agak panjang, mungkin mempengaruhi kualitas embedding"),
+    (30, "Data terlalu panjang untuk steganografi optimal"),
+)
+
+_QR_VERSION_THRESHOLDS = (3, 5, 7)
+_QR_VERSION_SCORES = (
+    (95, None),
+    (80, None),
+    (65, "QR code berukuran sedang, perhatikan ukuran gambar target"),
+    (40, "QR code besar, mungkin sulit disembunyikan"),
+)
+
+_CAPACITY_USAGE_THRESHOLDS = (50, 75, 90)
+_CAPACITY_USAGE_STATUS = (
+    "Kapasitas rendah - sangat aman",
+    "Kapasitas optimal - direkomendasikan",
+    "Kapasitas tinggi - masih aman",
+    "Kapasitas hampir penuh - perlu hati-hati",
+)
+
+# Skor kompatibilitas minimum per level (nilai >= ambang, bisect_right)
+_COMPATIBILITY_SCORE_THRESHOLDS = (50, 70, 85)
+_COMPATIBILITY_LEVELS = ('Poor', 'Fair', 'Good', 'Excellent')
+
+# Hasil gabungan untuk setiap pasangan (kelompok panjang data, kelompok versi QR), dihitung
+# sekali saat import: (skor kompatibilitas, level, concerns)
+_COMPATIBILITY_MATRIX = tuple(
+    tuple(
+        (round((length_score + size_score) / 2, 1),
+         _COMPATIBILITY_LEVELS[bisect_right(_COMPATIBILITY_SCORE_THRESHOLDS, (length_score + size_score) / 2)],
+         tuple(concern for concern in (length_concern, size_concern) if concern))
+        for size_score, size_concern in _QR_VERSION_SCORES
+    )
+    for length_score, length_concern in _DATA_LENGTH_SCORES
+)
+
+# Rekomendasi teks yang sudah jadi, dipilih dengan ambang yang sama seperti skor di atas
+_DATA_LENGTH_RECOMMENDATIONS = (
+    "✓ Panjang data optimal untuk steganografi",
+    "• Data dalam batas baik, pertimbangkan kompresi jika memungkinkan",
+    "⚠ Pertimbangkan untuk mempersingkat data atau menggunakan singkatan",
+    "❌ Data terlalu panjang, sangat disarankan untuk mempersingkat",
+)
+
+_EC_RECOMMENDATIONS = {
+    ec: f"✓ Gunakan error correction level {ec} ({name})"
+    for ec, name in (('L', 'Low'), ('M', 'Medium'), ('Q', 'Quartile'), ('H', 'High'))
+}
+
+# Skor kompatibilitas minimum (nilai >= ambang, bisect_right)
+_STEGO_SCORE_THRESHOLDS = (70, 85)
+_STEGO_SCORE_RECOMMENDATIONS = (
+    "⚠ Gunakan gambar target berukuran besar atau kurangi data",
+    "• Cocok untuk steganografi, gunakan gambar dengan resolusi tinggi",
+    "✓ Sangat cocok untuk steganografi pada gambar berukuran standar",
+)
+
+_STEGANOGRAPHY_RECOMMENDATIONS = {
+    "Excellent": ("✓ Ideal untuk semua jenis gambar dokumen",
+                  "✓ Kualitas visual akan tetap terjaga"),
+    "Good": ("• Gunakan gambar dengan resolusi minimal 800x600",
+             "• Hindari area dengan detail tinggi untuk embedding"),
+    "Fair": ("⚠ Gunakan gambar dengan resolusi tinggi (>1024x768)",
+             "⚠ Pertimbangkan untuk mengurangi ukuran QR code"),
+    "Poor": ("❌ QR code terlalu besar untuk steganografi yang baik",
+             "❌ Pertimbangkan kompresi data atau penggunaan gambar yang sangat besar"),
+}
+
+# Karakter mode alphanumeric QR; tabel translate menghapus semuanya, sehingga data
+# alphanumeric menjadi string kosong (pengecekan dilakukan dalam satu panggilan C)
+QR_ALPHANUMERIC_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:="
+_ALPHANUMERIC_DELETE = str.maketrans('', '', QR_ALPHANUMERIC_CHARS)
+# Versi bytes untuk data ASCII (bytes.translate jauh lebih cepat daripada str.translate)
+_ALPHANUMERIC_BYTES = QR_ALPHANUMERIC_CHARS.encode('ascii')
+
 def generate_qr(data: str, output_path: str, 
                 error_correction: str = 'L',
                 box_size: int = 10,
@@ -99,18 +231,10 @@ def generate_qr(data: str, output_path: str,
         if border < 0 or border > 20:
             raise ValueError("Border harus antara 0-20")
 
-        # Konversi error correction ke konstanta qrcode
-        error_levels = {
-            'L': qrcode.constants.ERROR_CORRECT_L,
-            'M': qrcode.constants.ERROR_CORRECT_M,
-            'Q': qrcode.constants.ERROR_CORRECT_Q,
-            'H': qrcode.constants.ERROR_CORRECT_H
-        }
-
         # Membuat instance QRCode dengan parameter yang dapat dikonfigurasi
         qr = qrcode.QRCode(
             version=None,  # Auto-determine optimal version
-            error_correction=error_levels[error_correction],
+            error_correction=_QRCODE_ERROR_LEVELS[error_correction],  # konstanta qrcode
             box_size=box_size,
             border=border,
         )
@@ -119,16 +243,25 @@ def generate_qr(data: str, output_path: str,
         qr.add_data(data)
         qr.make(fit=True)
 
-        # Membuat citra dengan warna kustom
-        img = qr.make_image(fill_color=fill_color, back_color=back_color)
-        
-        # Menyimpan citra ke file
-        img.save(output_path)
+        if fill_color == "black" and back_color == "white":
+            # Hitam-putih: matriks modul langsung ditulis sebagai PNG 1-bit, tanpa menggambar
+            # setiap modul lewat PIL
+            pixel_size = _write_monochrome_png(qr.get_matrix(), box_size, output_path)
+            # Sama dengan (img.width, img.height) milik PilImage qrcode: width = jumlah modul
+            image_size = (qr.modules_count, pixel_size)
+        else:
+            # Membuat citra dengan warna kustom
+            img = qr.make_image(fill_color=fill_color, back_color=back_color)
+
+            # Menyimpan citra ke file (selalu PNG); kompresi zlib level 1 cukup untuk citra QR
+            # yang blok-blok warnanya seragam, dan jauh lebih ringan daripada level default 6
+            img.save(output_path, compress_level=1)
+            image_size = (img.width, img.height)
         logger.info(f"QR Code berhasil dibuat dan disimpan di: {output_path}")
 
         # Jika metadata diperlukan, generate dan return
         if return_metadata:
-            metadata = _generate_metadata(qr, img, data, error_correction, output_path)
+            metadata = _generate_metadata(qr, image_size, data, error_correction, output_path)
             return {
                 "success": True,
                 "qr_path": output_path,
@@ -150,6 +283,9 @@ def analyze_qr_requirements(data: str) -> Dict:
     """
     Analyze QR code requirements without generating the actual image.
     
+    Results are memoized per (data length, data mode), the only inputs the analysis
+    depends on; each call returns its own copy.
+    
     Args:
         data (str): Data yang akan dianalisis
     
@@ -170,52 +306,7 @@ def analyze_qr_requirements(data: str) -> Dict:
         # Determine data mode (numeric, alphanumeric, or byte)
         data_mode = _determine_data_mode(data)
         
-        # Get capacity table based on data mode
-        capacity_table = _get_capacity_table(data_mode)
-        
-        # Find minimum version for each error correction level
-        version_analysis = {}
-        for ec_level in ['L', 'M', 'Q', 'H']:
-            min_version = _find_minimum_version(data_length, ec_level, capacity_table)
-            if min_version:
-                capacity = capacity_table.get(min_version, {}).get(ec_level, 0)
-                usage_percent = (data_length / capacity) * 100 if capacity > 0 else 100
-                
-                version_analysis[ec_level] = {
-                    'minimum_version': min_version,
-                    'capacity': capacity,
-                    'usage_percent': round(usage_percent, 1),
-                    'recommended': usage_percent <= 80  # Recommend if usage < 80%
-                }
-            else:
-                version_analysis[ec_level] = {
-                    'minimum_version': None,
-                    'capacity': 0,
-                    'usage_percent': 100,
-                    'recommended': False
-                }
-
-        # Determine best error correction level
-        recommended_ec = _recommend_error_correction(version_analysis)
-        recommended_version = version_analysis[recommended_ec]['minimum_version'] if recommended_ec else 1
-        
-        # Calculate steganography compatibility
-        stego_analysis = _analyze_steganography_compatibility(data_length, recommended_version)
-        
-        # Generate recommendations
-        recommendations = _generate_recommendations(data_length, version_analysis, stego_analysis)
-
-        return {
-            'data_length': data_length,
-            'data_mode': data_mode,
-            'recommended_version': recommended_version,
-            'recommended_error_correction': recommended_ec,
-            'version_analysis': version_analysis,
-            'steganography_analysis': stego_analysis,
-            'steganography_compatible': stego_analysis['compatibility_score'] >= 70,
-            'recommendations': recommendations,
-            'analysis_timestamp': None  # Could add timestamp if needed
-        }
+        return pickle.loads(_analyze_qr_requirements_cached(data_length, data_mode))
 
     except Exception as e:
         logger.error(f"Error dalam analisis QR requirements: {e}")
@@ -225,6 +316,41 @@ def analyze_qr_requirements(data: str) -> Dict:
             'recommendations': ['Terjadi error dalam analisis, periksa input data']
         }
 
+@lru_cache(maxsize=1024)
+def _analyze_qr_requirements_cached(data_length: int, data_mode: str) -> bytes:
+    """Cached analysis, pickled so every caller can unpickle a private copy."""
+    return pickle.dumps(_analyze_qr_requirements(data_length, data_mode), pickle.HIGHEST_PROTOCOL)
+
+def _analyze_qr_requirements(data_length: int, data_mode: str) -> Dict:
+    """Uncached analysis backing analyze_qr_requirements."""
+    # Find minimum version for each error correction level (all levels in one pass)
+    version_analysis = {
+        ec_level: _version_analysis_entry(data_length, fit)
+        for ec_level, fit in zip(_EC_INDEX, _minimum_versions(data_length, data_mode))
+    }
+
+    # Determine best error correction level
+    recommended_ec = _recommend_error_correction(version_analysis)
+    recommended_version = version_analysis[recommended_ec]['minimum_version'] if recommended_ec else 1
+    
+    # Calculate steganography compatibility
+    stego_analysis = _analyze_steganography_compatibility(data_length, recommended_version)
+    
+    # Generate recommendations
+    recommendations = _generate_recommendations(data_length, version_analysis, stego_analysis)
+
+    return {
+        'data_length': data_length,
+        'data_mode': data_mode,
+        'recommended_version': recommended_version,
+        'recommended_error_correction': recommended_ec,
+        'version_analysis': version_analysis,
+        'steganography_analysis': stego_analysis,
+        'steganography_compatible': stego_analysis['compatibility_score'] >= 70,
+        'recommendations': recommendations,
+        'analysis_timestamp': None  # Could add timestamp if needed
+    }
+
 def estimate_steganography_capacity(qr_size: Tuple[int, int], 
                                    target_image_size: Tuple[int, int] = (800, 600)) -> Dict:
     """
@@ -242,43 +368,12 @@ def estimate_steganography_capacity(qr_size: Tuple[int, int],
         >>> print(f"Embedding ratio: {capacity['embedding_ratio']:.2%}")
     """
     try:
-        qr_width, qr_height = qr_size
-        target_width, target_height = target_image_size
-        
-        if qr_width <= 0 or qr_height <= 0:
-            raise ValueError("QR size harus lebih besar dari 0")
-        
-        if target_width <= 0 or target_height <= 0:
-            raise ValueError("Target image size harus lebih besar dari 0")
-
-        # Calculate basic metrics
-        qr_pixels = qr_width * qr_height
-        target_pixels = target_width * target_height
-        embedding_ratio = qr_pixels / target_pixels
-        
-        # Calculate optimal embedding areas (avoid corners and edges)
-        safe_width = target_width * 0.8  # 80% of width is safe for embedding
-        safe_height = target_height * 0.8  # 80% of height is safe for embedding
-        safe_pixels = safe_width * safe_height
-        safe_embedding_ratio = qr_pixels / safe_pixels
-        
-        # Determine compatibility level
-        if safe_embedding_ratio <= 0.01:  # QR uses ≤1% of safe area
-            compatibility = "Excellent"
-            score = 95
-        elif safe_embedding_ratio <= 0.05:  # QR uses ≤5% of safe area
-            compatibility = "Good"
-            score = 80
-        elif safe_embedding_ratio <= 0.15:  # QR uses ≤15% of safe area
-            compatibility = "Fair"
-            score = 60
-        else:  # QR uses >15% of safe area
-            compatibility = "Poor"
-            score = 30
+        qr_pixels, target_pixels, embedding_ratio, safe_embedding_ratio, compatibility, score = \
+            _steganography_fit(qr_size, target_image_size)
 
         # Estimate LSB embedding capacity
         # Assuming 1 bit per pixel for LSB steganography
-        available_lsb_bits = target_pixels * 3  # RGB channels
+        available_lsb_bits = _lsb_capacity_bits(target_pixels)
         qr_bits_needed = qr_pixels  # 1 bit per QR pixel (black/white)
         lsb_utilization = qr_bits_needed / available_lsb_bits
         
@@ -314,6 +409,8 @@ def get_capacity_info(data_length: int, error_correction: str = 'M') -> Dict:
     """
     Get comprehensive capacity information for different error correction levels.
     
+    Results are memoized per (data_length, error_correction); each call returns its own copy.
+    
     Args:
         data_length (int): Panjang data dalam karakter
         error_correction (str): Level error correction saat ini ('L', 'M', 'Q', 'H')
@@ -333,75 +430,7 @@ def get_capacity_info(data_length: int, error_correction: str = 'M') -> Dict:
         if error_correction not in ['L', 'M', 'Q', 'H']:
             raise ValueError("Error correction harus 'L', 'M', 'Q', atau 'H'")
 
-        # Determine data mode
-        data_mode = "byte"  # Conservative assumption for mixed content
-        capacity_table = _get_capacity_table(data_mode)
-        
-        # Analyze all error correction levels
-        level_analysis = {}
-        for ec_level in ['L', 'M', 'Q', 'H']:
-            min_version = _find_minimum_version(data_length, ec_level, capacity_table)
-            
-            if min_version and min_version <= 10:  # Focus on versions 1-10 for practical use
-                capacity = capacity_table[min_version][ec_level]
-                usage_percent = (data_length / capacity) * 100
-                
-                # Calculate QR dimensions (approximate)
-                module_count = 17 + 4 * min_version  # QR formula: 17 + 4 * version
-                
-                level_analysis[ec_level] = {
-                    'version': min_version,
-                    'capacity': capacity,
-                    'usage_percent': round(usage_percent, 1),
-                    'remaining_capacity': capacity - data_length,
-                    'module_count': module_count,
-                    'error_correction_percent': {'L': 7, 'M': 15, 'Q': 25, 'H': 30}[ec_level],
-                    'recommended': 50 <= usage_percent <= 80,  # Sweet spot for capacity usage
-                    'status': _get_capacity_status(usage_percent)
-                }
-            else:
-                level_analysis[ec_level] = {
-                    'version': None,
-                    'capacity': 0,
-                    'usage_percent': 100,
-                    'remaining_capacity': 0,
-                    'module_count': 0,
-                    'error_correction_percent': {'L': 7, 'M': 15, 'Q': 25, 'H': 30}[ec_level],
-                    'recommended': False,
-                    'status': 'Data terlalu panjang'
-                }
-
-        # Current level analysis
-        current_level = level_analysis.get(error_correction, {})
-        
-        # Find best alternative
-        best_alternative = None
-        best_score = 0
-        for level, analysis in level_analysis.items():
-            if level != error_correction and analysis['recommended']:
-                # Score based on capacity efficiency and error correction strength
-                efficiency_score = 100 - abs(analysis['usage_percent'] - 65)  # Target 65% usage
-                error_strength = analysis['error_correction_percent']
-                combined_score = efficiency_score + (error_strength * 0.5)
-                
-                if combined_score > best_score:
-                    best_score = combined_score
-                    best_alternative = level
-
-        return {
-            'data_length': data_length,
-            'current_error_correction': error_correction,
-            'current_level': current_level,
-            'all_levels': level_analysis,
-            'best_alternative': best_alternative,
-            'alternatives': {k: v for k, v in level_analysis.items() if k != error_correction},
-            'summary': {
-                'optimal_version': current_level.get('version'),
-                'capacity_utilization': current_level.get('usage_percent', 0),
-                'steganography_friendly': current_level.get('usage_percent', 100) <= 75,
-                'upgrade_recommended': best_alternative is not None
-            }
-        }
+        return pickle.loads(_get_capacity_info_cached(data_length, error_correction))
 
     except Exception as e:
         logger.error(f"Error dalam get_capacity_info: {e}")
@@ -412,37 +441,176 @@ def get_capacity_info(data_length: int, error_correction: str = 'M') -> Dict:
             'summary': {'error': True}
         }
 
+@lru_cache(maxsize=512, typed=True)
+def _get_capacity_info_cached(data_length: int, error_correction: str) -> bytes:
+    """Cached capacity info, pickled so every caller can unpickle a private copy."""
+    return pickle.dumps(_get_capacity_info(data_length, error_correction), pickle.HIGHEST_PROTOCOL)
+
+def _get_capacity_info(data_length: int, error_correction: str) -> Dict:
+    """Uncached capacity info backing get_capacity_info."""
+    # Analyze all error correction levels (byte mode: conservative assumption for mixed content)
+    level_analysis = {}
+    for ec_level, fit in zip(_EC_INDEX, _minimum_versions(data_length, "byte")):
+        if fit:  # Focus on versions 1-10 for practical use
+            min_version, capacity = fit
+            usage_percent = (data_length / capacity) * 100
+            
+            # Calculate QR dimensions (approximate)
+            module_count = _MODULE_COUNT[min_version]  # QR formula: 17 + 4 * version
+            
+            level_analysis[ec_level] = {
+                'version': min_version,
+                'capacity': capacity,
+                'usage_percent': round(usage_percent, 1),
+                'remaining_capacity': capacity - data_length,
+                'module_count': module_count,
+                'error_correction_percent': _EC_RECOVERY_PERCENT[ec_level],
+                'recommended': 50 <= usage_percent <= 80,  # Sweet spot for capacity usage
+                'status': _get_capacity_status(usage_percent)
+            }
+        else:
+            level_analysis[ec_level] = {
+                'version': None,
+                'capacity': 0,
+                'usage_percent': 100,
+                'remaining_capacity': 0,
+                'module_count': 0,
+                'error_correction_percent': _EC_RECOVERY_PERCENT[ec_level],
+                'recommended': False,
+                'status': 'Data terlalu panjang'
+            }
+
+    # Current level analysis
+    current_level = level_analysis.get(error_correction, {})
+    
+    # Find best alternative
+    best_alternative = None
+    best_score = 0
+    for level, analysis in level_analysis.items():
+        if level != error_correction and analysis['recommended']:
+            # Score based on capacity efficiency and error correction strength
+            efficiency_score = 100 - abs(analysis['usage_percent'] - 65)  # Target 65% usage
+            error_strength = analysis['error_correction_percent']
+            combined_score = efficiency_score + (error_strength * 0.5)
+            
+            if combined_score > best_score:
+                best_score = combined_score
+                best_alternative = level
+
+    return {
+        'data_length': data_length,
+        'current_error_correction': error_correction,
+        'current_level': current_level,
+        'all_levels': level_analysis,
+        'best_alternative': best_alternative,
+        'alternatives': {k: v for k, v in level_analysis.items() if k != error_correction},
+        'summary': {
+            'optimal_version': current_level.get('version'),
+            'capacity_utilization': current_level.get('usage_percent', 0),
+            'steganography_friendly': current_level.get('usage_percent', 100) <= 75,
+            'upgrade_recommended': best_alternative is not None
+        }
+    }
+
 
 # ===============================
 # HELPER FUNCTIONS
 # ===============================
 
-def _generate_metadata(qr, img, data: str, error_correction: str, output_path: str) -> Dict:
+def _steganography_fit(qr_size: Tuple[int, int], target_image_size: Tuple[int, int]) -> Tuple:
+    """
+    Core ratios of estimate_steganography_capacity: (qr_pixels, target_pixels, embedding_ratio,
+    safe_embedding_ratio, compatibility level, compatibility score).
+    """
+    qr_width, qr_height = qr_size
+    target_width, target_height = target_image_size
+    
+    if qr_width <= 0 or qr_height <= 0:
+        raise ValueError("QR size harus lebih besar dari 0")
+    
+    if target_width <= 0 or target_height <= 0:
+        raise ValueError("Target image size harus lebih besar dari 0")
+
+    # Calculate basic metrics
+    qr_pixels = qr_width * qr_height
+    target_pixels = target_width * target_height
+    embedding_ratio = qr_pixels / target_pixels
+    
+    # Calculate optimal embedding areas (avoid corners and edges)
+    safe_width = target_width * 0.8  # 80% of width is safe for embedding
+    safe_height = target_height * 0.8  # 80% of height is safe for embedding
+    safe_pixels = safe_width * safe_height
+    safe_embedding_ratio = qr_pixels / safe_pixels
+    
+    # Determine compatibility level (QR uses ≤1%, ≤5%, ≤15% or >15% of safe area)
+    compatibility, score = _SAFE_RATIO_LEVELS[bisect_left(_SAFE_RATIO_THRESHOLDS, safe_embedding_ratio)]
+    
+    return qr_pixels, target_pixels, embedding_ratio, safe_embedding_ratio, compatibility, score
+
+def _lsb_capacity_bits(target_pixels: int) -> int:
+    """LSB embedding capacity of a target image: 1 bit per pixel in each RGB channel."""
+    return target_pixels * 3
+
+def _capacity_for(data_length: int, error_correction: str) -> Optional[Tuple[int, int, float]]:
+    """Minimum byte-mode version (1-10), its capacity and usage percent, or None if the data does not fit."""
+    version = _find_minimum_version(data_length, error_correction, "byte")
+    if version is None:
+        return None
+    capacity = QR_CAPACITY_BYTE[version][error_correction]
+    return version, capacity, (data_length / capacity) * 100
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    """Build one PNG chunk: length, tag, data and CRC32 over tag + data."""
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+def _write_monochrome_png(matrix: List[List[bool]], box_size: int, output_path: str) -> int:
+    """
+    Write a QR module matrix (border included, True = dark) as a 1-bit grayscale PNG,
+    each module scaled to box_size x box_size pixels. Returns the image side in pixels.
+    """
+    # Bit 1 = putih; setiap baris modul dikemas per 8 piksel lalu diulang box_size kali
+    light = ~np.asarray(matrix, dtype=bool)
+    packed = np.packbits(np.repeat(light, box_size, axis=1), axis=1)
+    rows = np.repeat(packed, box_size, axis=0)
+    # Byte filter 0 (None) di awal setiap baris
+    scanlines = np.pad(rows, ((0, 0), (1, 0)))
+
+    pixel_size = light.shape[0] * box_size
+    ihdr = struct.pack(">IIBBBBB", pixel_size, pixel_size, 1, 0, 0, 0, 0)
+    with open(output_path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", ihdr))
+        f.write(_png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 1)))
+        f.write(_png_chunk(b"IEND", b""))
+
+    return pixel_size
+
+def _generate_metadata(qr, image_size: Tuple[int, int], data: str, error_correction: str,
+                       output_path: str) -> Dict:
     """Generate comprehensive metadata for QR code."""
     try:
         data_length = len(data)
         version = qr.version
         
         # Calculate module count and dimensions
-        module_count = 17 + 4 * version  # QR formula
-        pixel_width = img.width
-        pixel_height = img.height
+        module_count = _MODULE_COUNT[version]  # QR formula
+        pixel_width, pixel_height = image_size
         
-        # Get capacity information
-        capacity_info = get_capacity_info(data_length, error_correction)
-        current_capacity = capacity_info['current_level'].get('capacity', 0)
+        # Get capacity and usage percentage (only the current level is needed, not the full
+        # get_capacity_info breakdown)
+        current_fit = _capacity_for(data_length, error_correction)
+        current_capacity, capacity_used = current_fit[1:] if current_fit else (0, 100)
         
-        # Calculate usage percentage
-        capacity_used = (data_length / current_capacity * 100) if current_capacity > 0 else 100
-        
-        # Estimate steganography capacity
-        stego_capacity = estimate_steganography_capacity((pixel_width, pixel_height))
+        # Estimate steganography capacity against the default 800x600 target, computing only
+        # the fields used below rather than the full estimate_steganography_capacity result
+        qr_size = (pixel_width, pixel_height)
+        _, target_pixels, embedding_ratio, _, _, stego_score = _steganography_fit(qr_size, (800, 600))
         
         # Generate recommendations
         recommendations = []
         if capacity_used > 80:
             recommendations.append("Pertimbangkan untuk mengurangi panjang data")
-        if stego_capacity['compatibility_score'] < 70:
+        if stego_score < 70:
             recommendations.append("QR Code mungkin terlalu besar untuk steganografi optimal")
         if error_correction == 'L' and data_length > 100:
             recommendations.append("Pertimbangkan error correction level yang lebih tinggi")
@@ -455,10 +623,10 @@ def _generate_metadata(qr, img, data: str, error_correction: str, output_path: s
             'error_correction': error_correction,
             'capacity_used': round(capacity_used, 1),
             'max_capacity': current_capacity,
-            'estimated_embedding_capacity': stego_capacity.get('lsb_capacity_bits', 0),
-            'steganography_compatible': stego_capacity.get('compatibility_score', 0) >= 70,
-            'steganography_score': stego_capacity.get('compatibility_score', 0),
-            'quality_impact': stego_capacity.get('quality_impact', {}),
+            'estimated_embedding_capacity': _lsb_capacity_bits(target_pixels),
+            'steganography_compatible': stego_score >= 70,
+            'steganography_score': stego_score,
+            'quality_impact': _estimate_quality_impact(embedding_ratio, qr_size),
             'recommendations': recommendations
         }
     except Exception as e:
@@ -469,28 +637,47 @@ def _determine_data_mode(data: str) -> str:
     """Determine the most efficient QR data mode for given data."""
     if data.isdigit():
         return "numeric"
-    elif all(c in "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:=" for c in data.upper()):
+    elif data.isascii():
+        return "byte" if data.encode('ascii').upper().translate(None, _ALPHANUMERIC_BYTES) else "alphanumeric"
+    # Non-ASCII: upper() can still map some characters into the set (e.g. "ſ" -> "S")
+    elif not data.upper().translate(_ALPHANUMERIC_DELETE):
         return "alphanumeric"
     else:
         return "byte"
 
-def _get_capacity_table(data_mode: str) -> Dict:
-    """Get capacity table for specified data mode."""
-    tables = {
-        "numeric": QR_CAPACITY_NUMERIC,
-        "alphanumeric": QR_CAPACITY_ALPHANUMERIC,
-        "byte": QR_CAPACITY_BYTE
+def _minimum_versions(data_length: int, data_mode: str) -> List[Optional[Tuple[int, int]]]:
+    """
+    Find the minimum QR version and its capacity for every error correction level at once.
+    
+    Returns one entry per level in L, M, Q, H order: (version, capacity), or None if the
+    data does not fit in versions 1-10.
+    """
+    capacities = _CAPACITY_ARRAYS.get(data_mode, _CAPACITY_ARRAYS["byte"])
+    fits = capacities >= data_length
+    rows = fits.argmax(axis=0)  # first fitting version per column
+    return [(row + 1, capacity) if fit else None
+            for row, capacity, fit in zip(rows.tolist(), capacities[rows, _EC_COLUMNS].tolist(),
+                                          fits.any(axis=0).tolist())]
+
+def _version_analysis_entry(data_length: int, fit: Optional[Tuple[int, int]]) -> Dict:
+    """One error correction level of analyze_qr_requirements' version_analysis, from a _minimum_versions entry."""
+    if not fit:
+        return {'minimum_version': None, 'capacity': 0, 'usage_percent': 100, 'recommended': False}
+    min_version, capacity = fit
+    usage_percent = (data_length / capacity) * 100 if capacity > 0 else 100
+    return {
+        'minimum_version': min_version,
+        'capacity': capacity,
+        'usage_percent': round(usage_percent, 1),
+        'recommended': usage_percent <= 80  # Recommend if usage < 80%
     }
-    return tables.get(data_mode, QR_CAPACITY_BYTE)
 
-def _find_minimum_version(data_length: int, error_correction: str, capacity_table: Dict) -> Optional[int]:
+def _find_minimum_version(data_length: int, error_correction: str, data_mode: str) -> Optional[int]:
     """Find minimum QR version that can accommodate the data."""
-    for version in range(1, 11):  # Focus on versions 1-10 for practical use
-        if version in capacity_table:
-            capacity = capacity_table[version].get(error_correction, 0)
-            if capacity >= data_length:
-                return version
-    return None
+    # Focus on versions 1-10 for practical use
+    capacities = _CAPACITY_ARRAYS.get(data_mode, _CAPACITY_ARRAYS["byte"])[:, _EC_INDEX[error_correction]]
+    index = int(np.searchsorted(capacities, data_length))
+    return index + 1 if index < len(capacities) else None
 
 def _recommend_error_correction(version_analysis: Dict) -> Optional[str]:
     """Recommend best error correction level based on analysis."""
@@ -522,88 +709,37 @@ def _analyze_steganography_compatibility(data_length: int, qr_version: Optional[
         }
     
     # Calculate estimated pixel size
-    module_count = 17 + 4 * qr_version
-    estimated_pixels = (module_count * 10 + 8) ** 2  # Assuming 10px box_size + border
-    
-    concerns = []
-    
-    # Analyze based on data length
-    if data_length <= 50:
-        length_score = 90
-    elif data_length <= 100:
-        length_score = 75
-    elif data_length <= 200:
-        length_score = 60
-        concerns.append("Data agak panjang, mungkin mempengaruhi kualitas embedding")
-    else:
-        length_score = 30
-        concerns.append("Data terlalu panjang untuk steganografi optimal")
-    
-    # Analyze based on QR version/size
-    if qr_version <= 3:
-        size_score = 95
-    elif qr_version <= 5:
-        size_score = 80
-    elif qr_version <= 7:
-        size_score = 65
-        concerns.append("QR code berukuran sedang, perhatikan ukuran gambar target")
-    else:
-        size_score = 40
-        concerns.append("QR code besar, mungkin sulit disembunyikan")
-    
-    # Combined score
-    compatibility_score = (length_score + size_score) / 2
-    
-    if compatibility_score >= 85:
-        level = 'Excellent'
-    elif compatibility_score >= 70:
-        level = 'Good'
-    elif compatibility_score >= 50:
-        level = 'Fair'
-    else:
-        level = 'Poor'
+    estimated_pixels = _ESTIMATED_PIXELS[qr_version]  # Assuming 10px box_size + border
+    
+    # Analyze based on data length and on QR version/size; the combined score, level and
+    # concerns for each pair of buckets are precomputed
+    length_bucket = bisect_left(_DATA_LENGTH_THRESHOLDS, data_length)
+    size_bucket = bisect_left(_QR_VERSION_THRESHOLDS, qr_version)
+    compatibility_score, level, concerns = _COMPATIBILITY_MATRIX[length_bucket][size_bucket]
     
     return {
-        'compatibility_score': round(compatibility_score, 1),
+        'compatibility_score': compatibility_score,
         'level': level,
-        'length_score': length_score,
-        'size_score': size_score,
+        'length_score': _DATA_LENGTH_SCORES[length_bucket][0],
+        'size_score': _QR_VERSION_SCORES[size_bucket][0],
         'estimated_pixels': estimated_pixels,
-        'concerns': concerns
+        'concerns': list(concerns)
     }
 
 def _generate_recommendations(data_length: int, version_analysis: Dict, stego_analysis: Dict) -> List[str]:
     """Generate actionable recommendations based on analysis."""
-    recommendations = []
-    
     # Data length recommendations
-    if data_length <= 50:
-        recommendations.append("✓ Panjang data optimal untuk steganografi")
-    elif data_length <= 100:
-        recommendations.append("• Data dalam batas baik, pertimbangkan kompresi jika memungkinkan")
-    elif data_length <= 200:
-        recommendations.append("⚠ Pertimbangkan untuk mempersingkat data atau menggunakan singkatan")
-    else:
-        recommendations.append("❌ Data terlalu panjang, sangat disarankan untuk mempersingkat")
+    recommendations = [_DATA_LENGTH_RECOMMENDATIONS[bisect_left(_DATA_LENGTH_THRESHOLDS, data_length)]]
     
     # Error correction recommendations
-    recommended_ec = None
     for ec, analysis in version_analysis.items():
         if analysis.get('recommended', False):
-            recommended_ec = ec
+            recommendations.append(_EC_RECOMMENDATIONS[ec])
             break
     
-    if recommended_ec:
-        ec_names = {'L': 'Low', 'M': 'Medium', 'Q': 'Quartile', 'H': 'High'}
-        recommendations.append(f"✓ Gunakan error correction level {recommended_ec} ({ec_names[recommended_ec]})")
-    
     # Steganography recommendations
-    if stego_analysis['compatibility_score'] >= 85:
-        recommendations.append("✓ Sangat cocok untuk steganografi pada gambar berukuran standar")
-    elif stego_analysis['compatibility_score'] >= 70:
-        recommendations.append("• Cocok untuk steganografi, gunakan gambar dengan resolusi tinggi")
-    else:
-        recommendations.append("⚠ Gunakan gambar target berukuran besar atau kurangi data")
+    recommendations.append(_STEGO_SCORE_RECOMMENDATIONS[
+        bisect_right(_STEGO_SCORE_THRESHOLDS, stego_analysis['compatibility_score'])])
     
     return recommendations
 
@@ -611,22 +747,8 @@ def _estimate_quality_impact(embedding_ratio: float, qr_size: Tuple[int, int]) -
     """Estimate quality impact of QR embedding on target image."""
     qr_pixels = qr_size[0] * qr_size[1]
     
-    if embedding_ratio <= 0.01:
-        impact_level = "Minimal"
-        visual_change = "Tidak terlihat dengan mata biasa"
-        psnr_estimate = ">40 dB"
-    elif embedding_ratio <= 0.05:
-        impact_level = "Low"
-        visual_change = "Sedikit perubahan pada analisis detail"
-        psnr_estimate = "35-40 dB"
-    elif embedding_ratio <= 0.15:
-        impact_level = "Moderate"
-        visual_change = "Perubahan mungkin terlihat pada pemeriksaan teliti"
-        psnr_estimate = "25-35 dB"
-    else:
-        impact_level = "High"
-        visual_change = "Perubahan cukup terlihat"
-        psnr_estimate = "<25 dB"
+    impact_level, visual_change, psnr_estimate = \
+        _QUALITY_IMPACT_LEVELS[bisect_left(_EMBEDDING_RATIO_THRESHOLDS, embedding_ratio)]
     
     return {
         'impact_level': impact_level,
@@ -638,20 +760,8 @@ def _estimate_quality_impact(embedding_ratio: float, qr_size: Tuple[int, int]) -
 
 def _generate_steganography_recommendations(compatibility: str, embedding_ratio: float) -> List[str]:
     """Generate specific recommendations for steganography."""
-    recommendations = []
-    
-    if compatibility == "Excellent":
-        recommendations.append("✓ Ideal untuk semua jenis gambar dokumen")
-        recommendations.append("✓ Kualitas visual akan tetap terjaga")
-    elif compatibility == "Good":
-        recommendations.append("• Gunakan gambar dengan resolusi minimal 800x600")
-        recommendations.append("• Hindari area dengan detail tinggi untuk embedding")
-    elif compatibility == "Fair":
-        recommendations.append("⚠ Gunakan gambar dengan resolusi tinggi (>1024x768)")
-        recommendations.append("⚠ Pertimbangkan untuk mengurangi ukuran QR code")
-    else:
-        recommendations.append("❌ QR code terlalu besar untuk steganografi yang baik")
-        recommendations.append("❌ Pertimbangkan kompresi data atau penggunaan gambar yang sangat besar")
+    recommendations = list(_STEGANOGRAPHY_RECOMMENDATIONS.get(compatibility,
+                                                              _STEGANOGRAPHY_RECOMMENDATIONS["Poor"]))
     
     if embedding_ratio > 0.1:
         recommendations.append("• Pertimbangkan penggunaan multiple gambar untuk distribusi QR")
@@ -660,20 +770,75 @@ def _generate_steganography_recommendations(compatibility: str, embedding_ratio:
 
 def _get_capacity_status(usage_percent: float) -> str:
     """Get human-readable status for capacity usage."""
-    if usage_percent <= 50:
-        return "Kapasitas rendah - sangat aman"
-    elif usage_percent <= 75:
-        return "Kapasitas optimal - direkomendasikan"
-    elif usage_percent <= 90:
-        return "Kapasitas tinggi - masih aman"
-    else:
-        return "Kapasitas hampir penuh - perlu hati-hati"
+    return _CAPACITY_USAGE_STATUS[bisect_left(_CAPACITY_USAGE_THRESHOLDS, usage_percent)]
 
 
 # ===============================
 # ORIGINAL FUNCTIONS (Backward Compatibility)
 # ===============================
 
+# Detector QR per thread: dibuat sekali lalu dipakai ulang, tanpa lock antar thread
+_qr_detector_local = threading.local()
+
+def _get_qr_detector() -> "cv2.QRCodeDetector":
+    """Return this thread's QRCodeDetector, creating it on first use."""
+    detector = getattr(_qr_detector_local, "detector", None)
+    if detector is None:
+        detector = _qr_detector_local.detector = cv2.QRCodeDetector()
+    return detector
+
+def _read_qr_zbar(img) -> List[str]:
+    """Decode QR Codes with ZBar; empty if none is found or the data is not valid UTF-8."""
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    try:
+        return [symbol.data.decode('utf-8') for symbol in _zbar_decode(img, symbols=[ZBarSymbol.QRCODE])
+                if symbol.data]
+    except UnicodeDecodeError:
+        return []
+
+def read_qr_from_array(img, source: str = "citra") -> List[str]:
+    """
+    Membaca semua QR Code dari citra yang sudah ada di memori, dalam satu panggilan
+    detectAndDecodeMulti (tanpa menulis/membaca file). Jika pyzbar terpasang, ZBar
+    dicoba lebih dulu.
+
+    Args:
+        img (numpy.ndarray): Citra grayscale (H, W) atau BGR (H, W, 3), uint8.
+        source (str): Nama sumber citra untuk pesan log.
+
+    Returns:
+        List[str]: Data (string UTF-8) yang berhasil dibaca; kosong jika tidak ada QR Code.
+    """
+    # ZBar lebih dulu bila tersedia; OpenCV tetap dipakai jika ZBar tidak menemukan apa pun
+    if _zbar_decode is not None:
+        data_list = _read_qr_zbar(img)
+        if data_list:
+            return data_list
+
+    # QR code detector milik thread ini (dipakai ulang antar panggilan)
+    qr_detector = _get_qr_detector()
+
+    # Membaca QR code dari citra
+    # retval: bool (berhasil/tidak)
+    # decoded_info: string (data QR code)
+    # points: numpy.ndarray (koordinat QR code)
+    # straight_qrcode: numpy.ndarray (citra QR code yang telah diluruskan)
+    retval, decoded_info, points, straight_qrcode = qr_detector.detectAndDecodeMulti(img)
+
+    # Jika QR code terdeteksi
+    if retval:
+        # Filter out empty strings and convert to list
+        data_list = [text for text in decoded_info if text]
+    else:
+        data_list = []
+
+    # Memberi informasi jika tidak ada QR Code yang terdeteksi
+    if not data_list:
+        logger.warning(f"Tidak ada QR Code yang terdeteksi di: {source}")
+    return data_list
+
+
 def read_qr(image_path: str) -> List[str]:
     """
     Membaca data dari sebuah citra QR Code menggunakan OpenCV.
@@ -695,32 +860,15 @@ def read_qr(image_path: str) -> List[str]:
         raise FileNotFoundError(f"File tidak ditemukan: {image_path}")
 
     try:
-        # Membaca citra menggunakan OpenCV
-        img = cv2.imread(image_path)
+        # Membaca citra menggunakan OpenCV, langsung grayscale (detector bekerja pada
+        # citra satu channel); baca berwarna hanya jika format tersebut gagal dibaca grayscale
+        img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            img = cv2.imread(image_path)
         if img is None:
             raise ValueError(f"Gagal membaca citra: {image_path}")
 
-        # Inisialisasi QR code detector
-        qr_detector = cv2.QRCodeDetector()
-        
-        # Membaca QR code dari citra
-        # retval: bool (berhasil/tidak)
-        # decoded_info: string (data QR code)
-        # points: numpy.ndarray (koordinat QR code)
-        # straight_qrcode: numpy.ndarray (citra QR code yang telah diluruskan)
-        retval, decoded_info, points, straight_qrcode = qr_detector.detectAndDecodeMulti(img)
-        
-        # Jika QR code terdeteksi
-        if retval:
-            # Filter out empty strings and convert to list
-            data_list = [text for text in decoded_info if text]
-        else:
-            data_list = []
-
-        # Memberi informasi jika tidak ada QR Code yang terdeteksi
-        if not data_list:
-            logger.warning(f"Tidak ada QR Code yang terdeteksi di: {image_path}")
-        return data_list
+        return read_qr_from_array(img, image_path)
     except Exception as e:
         # Menangani potensi error saat membuka citra atau proses decoding
         logger.error(f"Error saat membaca QR Code: {e}")
@@ -735,6 +883,8 @@ def quick_qr_analysis(data: str, error_correction: str = 'M') -> Dict:
     """
     Quick analysis function that combines requirements analysis and capacity info.
     
+    Results are memoized per (data, error_correction); each call returns its own copy.
+    
     Args:
         data (str): Data untuk dianalisis
         error_correction (str): Error correction level
@@ -743,33 +893,51 @@ def quick_qr_analysis(data: str, error_correction: str = 'M') -> Dict:
         Dict: Combined analysis results
     """
     try:
-        requirements = analyze_qr_requirements(data)
-        capacity = get_capacity_info(len(data), error_correction)
-        
-        return {
-            'data_summary': {
-                'length': len(data),
-                'mode': requirements.get('data_mode', 'unknown'),
-                'recommended_version': requirements.get('recommended_version'),
-                'recommended_ec': requirements.get('recommended_error_correction')
-            },
-            'capacity_analysis': capacity,
-            'steganography_analysis': requirements.get('steganography_analysis', {}),
-            'overall_recommendation': requirements.get('recommendations', [])[:3],  # Top 3 recommendations
-            'quick_status': {
-                'steganography_ready': requirements.get('steganography_compatible', False),
-                'capacity_efficient': capacity['summary'].get('capacity_utilization', 100) <= 80,
-                'version_reasonable': requirements.get('recommended_version', 99) <= 5
-            }
-        }
+        return pickle.loads(_quick_qr_analysis_cached(data, error_correction))
     except Exception as e:
         logger.error(f"Error in quick_qr_analysis: {e}")
         return {'error': str(e)}
 
+@lru_cache(maxsize=1024)
+def _quick_qr_analysis_cached(data: str, error_correction: str) -> bytes:
+    """Cached quick analysis, pickled so every caller can unpickle a private copy."""
+    return pickle.dumps(_quick_qr_analysis(data, error_correction), pickle.HIGHEST_PROTOCOL)
+
+def _quick_qr_analysis(data: str, error_correction: str) -> Dict:
+    """Uncached analysis backing quick_qr_analysis."""
+    requirements = analyze_qr_requirements(data)
+    capacity = get_capacity_info(len(data), error_correction)
+    
+    return {
+        'data_summary': {
+            'length': len(data),
+            'mode': requirements.get('data_mode', 'unknown'),
+            'recommended_version': requirements.get('recommended_version'),
+            'recommended_ec': requirements.get('recommended_error_correction')
+        },
+        'capacity_analysis': capacity,
+        'steganography_analysis': requirements.get('steganography_analysis', {}),
+        'overall_recommendation': requirements.get('recommendations', [])[:3],  # Top 3 recommendations
+        'quick_status': {
+            'steganography_ready': requirements.get('steganography_compatible', False),
+            'capacity_efficient': capacity['summary'].get('capacity_utilization', 100) <= 80,
+            'version_reasonable': requirements.get('recommended_version', 99) <= 5
+        }
+    }
+
+# Hasil generate_qr_with_analysis terakhir (LRU): (data, kwargs terurut) -> (byte PNG, hasil
+# ter-pickle). PNG dan analisis deterministik, jadi permintaan berulang cukup menyalin byte-nya
+_QR_RESULT_CACHE: "OrderedDict[Tuple, Tuple[bytes, bytes]]" = OrderedDict()
+_QR_RESULT_CACHE_SIZE = 512
+_qr_result_cache_lock = threading.Lock()
+
 def generate_qr_with_analysis(data: str, output_path: str, **kwargs) -> Dict:
     """
     Generate QR code with comprehensive analysis in one call.
     
+    Repeated calls with the same data and parameters reuse the cached PNG bytes and
+    analysis instead of rendering again; each call returns its own copy.
+    
     Args:
         data (str): Data untuk QR code
         output_path (str): Path output file
@@ -779,6 +947,22 @@ def generate_qr_with_analysis(data: str, output_path: str, **kwargs) -> Dict:
         Dict: Generation result with complete analysis
     """
     try:
+        cache_key = (data, tuple(sorted(kwargs.items())))
+        with _qr_result_cache_lock:
+            cached = _QR_RESULT_CACHE.get(cache_key)
+            if cached is not None:
+                _QR_RESULT_CACHE.move_to_end(cache_key)
+
+        if cached is not None:
+            png_bytes, pickled_result = cached
+            with open(output_path, "wb") as f:
+                f.write(png_bytes)
+            logger.info(f"QR Code berhasil dibuat dan disimpan di: {output_path}")
+
+            result = pickle.loads(pickled_result)
+            result['qr_path'] = output_path
+            return result
+
         # Generate QR with metadata
         result = generate_qr(data, output_path, return_metadata=True, **kwargs)
         
@@ -787,13 +971,24 @@ def generate_qr_with_analysis(data: str, output_path: str, **kwargs) -> Dict:
             analysis = quick_qr_analysis(data, kwargs.get('error_correction', 'M'))
             result['comprehensive_analysis'] = analysis
             
-            # Add file info
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
+            # Add file info (ukuran diambil dari byte yang dibaca untuk cache, tanpa stat terpisah)
+            try:
+                with open(output_path, "rb") as f:
+                    png_bytes = f.read()
+            except FileNotFoundError:
+                png_bytes = None
+
+            if png_bytes is not None:
+                file_size = len(png_bytes)
                 result['file_info'] = {
                     'size_bytes': file_size,
                     'size_kb': round(file_size / 1024, 2)
                 }
+
+                with _qr_result_cache_lock:
+                    _QR_RESULT_CACHE[cache_key] = (png_bytes, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+                    if len(_QR_RESULT_CACHE) > _QR_RESULT_CACHE_SIZE:
+                        _QR_RESULT_CACHE.popitem(last=False)
         
         return result
         
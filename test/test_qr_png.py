@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the 1-bit PNG writer used by qr_utils.generate_qr.
+
+Black-on-white QR codes are written by _write_monochrome_png instead of PIL; these
+tests compare its output pixel-for-pixel with qrcode's own make_image() rendering
+and check that the written file still decodes.
+
+Usage:
+    python -m pytest test/test_qr_png.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+import qrcode
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import qr_utils  # noqa: E402
+
+
+# (data, error correction, box_size, border); widths cover both multiples of 8 and
+# widths that need packbits padding at the end of each row
+CASES = [
+    ("Hello World", "L", 1, 0),
+    ("Hello World", "M", 3, 1),
+    ("https://example.com/dokumen/12345", "Q", 5, 2),
+    ("Data watermark dokumen", "H", 7, 4),
+    ("1234567890" * 20, "M", 10, 4),
+    ("ü漢字 non-ASCII", "L", 8, 3),
+]
+
+
+def _reference_pixels(data: str, error_correction: str, box_size: int, border: int) -> np.ndarray:
+    """Render the same QR through qrcode's PIL image, as generate_qr did before."""
+    qr = qrcode.QRCode(
+        version=None,
+        error_correction=qr_utils._QRCODE_ERROR_LEVELS[error_correction],
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return np.array(qr.make_image(fill_color="black", back_color="white").get_image().convert('L'))
+
+
+@pytest.mark.parametrize("data,error_correction,box_size,border", CASES)
+def test_monochrome_png_matches_pil_rendering(tmp_path, data, error_correction, box_size, border):
+    output_path = str(tmp_path / "qr.png")
+    qr_utils.generate_qr(data, output_path, error_correction=error_correction,
+                         box_size=box_size, border=border)
+
+    with Image.open(output_path) as img:
+        assert img.format == "PNG"
+        assert img.mode == "1"
+        pixels = np.array(img.convert('L'))
+
+    expected = _reference_pixels(data, error_correction, box_size, border)
+    assert pixels.shape == expected.shape
+    assert np.array_equal(pixels, expected)
+
+
+@pytest.mark.parametrize("data,error_correction,box_size,border",
+                         [case for case in CASES if case[2] >= 3])
+def test_monochrome_png_is_readable(tmp_path, data, error_correction, box_size, border):
+    output_path = str(tmp_path / "qr.png")
+    qr_utils.generate_qr(data, output_path, error_correction=error_correction,
+                         box_size=box_size, border=border)
+
+    assert qr_utils.read_qr(output_path) == [data]
+
+
+def test_metadata_size_matches_pil_path(tmp_path):
+    # The fast path reports the same size_pixels as the PIL path (custom colours)
+    fast = qr_utils.generate_qr("Hello World", str(tmp_path / "a.png"), box_size=6, border=2,
+                                return_metadata=True)
+    pil = qr_utils.generate_qr("Hello World", str(tmp_path / "b.png"), box_size=6, border=2,
+                               fill_color="#000000", back_color="#ffffff", return_metadata=True)
+    assert fast["metadata"] == pil["metadata"]